@@ -0,0 +1,103 @@
+"""
+Time connected_components with the adjacency indexed Graph against the
+old Graph.adj_to that scanned every edge.
+
+python3 bench_components.py [ --seed int ] [ --num_v int ] [ --num_e int ]
+    [ --full_old ]
+
+connected_components calls adj_to once for each vertex, so with the old
+adj_to it is O(n m): hours on the default 50k vertex graph.  Unless
+--full_old is given, the old time is estimated from the time of old
+adj_to calls on a sample of 100 vertices.
+"""
+
+import random
+import sys
+import time
+
+import graph
+
+class OldGraph(graph.Graph):
+    """
+    Graph with adj_to as it was before the adjacency index.
+    """
+    def adj_to(self, v):
+        neighbours = set()
+
+        for (x, y) in self._edges:
+            if x == v: neighbours.add(y)
+            if y == v: neighbours.add(x)
+
+        return neighbours
+
+seed = None
+num_vertices = 50000
+num_edges = 50000
+full_old = False
+
+argv = sys.argv[1:]
+while argv:
+    token = argv.pop(0)
+    if token == "--seed":
+        seed = int(argv.pop(0))
+    elif token == "--num_v":
+        num_vertices = int(argv.pop(0))
+    elif token == "--num_e":
+        num_edges = int(argv.pop(0))
+    elif token == "--full_old":
+        full_old = True
+    else:
+        print("Bad argument {}".format(token))
+        sys.exit(1)
+
+if seed is not None:
+    random.seed(seed)
+
+edges = set()
+while len(edges) < num_edges:
+    (x, y) = (random.randrange(num_vertices), random.randrange(num_vertices))
+    if x != y:
+        edges.add((min(x, y), max(x, y)))
+
+G = graph.Graph()
+old = OldGraph()
+for H in (G, old):
+    for v in range(num_vertices):
+        H.add_vertex(v)
+    for e in edges:
+        H.add_edge(e)
+
+print("{} vertices, {} edges".format(num_vertices, num_edges))
+
+t = time.perf_counter()
+C = graph.connected_components(G)
+new_time = time.perf_counter() - t
+print("{:>10}: {:10.3f}s  {} components".format("indexed", new_time, len(C)))
+
+# the union-find components are already up to date, only sorting
+# and copying them is left
+t = time.perf_counter()
+U = G.components()
+uf_time = time.perf_counter() - t
+if U != C:
+    print("MISMATCH between union-find and search")
+    sys.exit(1)
+print("{:>10}: {:10.3f}s".format("union-find", uf_time))
+
+if full_old:
+    t = time.perf_counter()
+    old_C = graph.connected_components(old)
+    old_time = time.perf_counter() - t
+    if old_C != C:
+        print("MISMATCH")
+        sys.exit(1)
+    print("{:>10}: {:10.3f}s".format("edge scan", old_time))
+else:
+    sample = random.sample(range(num_vertices), min(100, num_vertices))
+    t = time.perf_counter()
+    for v in sample:
+        old.adj_to(v)
+    old_time = (time.perf_counter() - t) / len(sample) * num_vertices
+    print("{:>10}: {:10.3f}s  (estimated)".format("edge scan", old_time))
+
+print("{:>10}: {:10.1f}x".format("speedup", old_time / new_time))
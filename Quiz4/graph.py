@@ -9,10 +9,16 @@ where
     and the pair is ordered such that v < w
 
 Note: this means no self loops, i.e an edge (v, v) from v back to itself.
+
+Alongside E the graph keeps, for each vertex, the set of its
+neighbours, so looking up the neighbours of a vertex does not have to
+go through every edge.  It also keeps its connected components up to
+date in a union-find structure as edges are added.
 """
 
-import random
-import copy
+import randgraph
+import traverse
+from unionfind import UnionFind
 
 class Graph:
     """
@@ -21,12 +27,19 @@ class Graph:
     def __init__(self):
         self._vertices = set()
         self._edges = set()
+        # vertex -> set of neighbours, kept in step with _edges
+        self._adj = {}
+        # connected components, kept in step with _edges
+        self._components = UnionFind()
 
     def __repr__(self):
         return "Graph({},{})".format(self._vertices, self._edges)
 
     def add_vertex(self, v):
-        self._vertices.add(v)
+        if v not in self._adj:
+            self._vertices.add(v)
+            self._adj[v] = set()
+            self._components.add(v)
 
     def add_edge(self, e):
         """
@@ -50,6 +63,9 @@ class Graph:
         if y not in self._vertices:
             self.add_vertex(y)
         self._edges.add( (x, y) )
+        self._adj[x].add(y)
+        self._adj[y].add(x)
+        self._components.union(x, y)
 
     def num_edges(self):
         return len(self._edges)
@@ -69,6 +85,49 @@ class Graph:
         """
         return self._edges
 
+    def same_component(self, v, w):
+        """
+        Returns True if there is a path between v and w.
+
+        >>> G = graph_from_edges([(1, 2), (3, 4)])
+        >>> G.same_component(1, 2)
+        True
+        >>> G.same_component(1, 4)
+        False
+        >>> G.add_edge((2, 3))
+        >>> G.same_component(1, 4)
+        True
+        """
+        return self._components.same(v, w)
+
+    def component_of(self, v):
+        """
+        Returns the set of vertices in the connected component of v.  It
+        is the graph's own set, so it should not be changed.
+
+        >>> G = graph_from_edges([(1, 2), (3, 4)])
+        >>> G.component_of(4) == {3, 4}
+        True
+        """
+        return self._components.component_of(v)
+
+    def components(self):
+        """
+        Returns the connected components of the graph, as a list of sets
+        of vertices ordered by the smallest vertex of each.  This is the
+        same answer as connected_components(G), but kept up to date as
+        the graph is built instead of found by searching the graph.
+        Like connected_components, it returns new sets every time.
+
+        >>> G = graph_from_edges([(5, 2), (1, 3)])
+        >>> G.add_vertex(0)
+        >>> G.components()
+        [{0}, {1, 3}, {2, 5}]
+        >>> G.components() == connected_components(G)
+        True
+        """
+        return self._components.components()
+
     def adj_to(self, v):
         """
         return the set of neighbours of vertex v
@@ -84,36 +143,43 @@ class Graph:
         >>> G.add_edge((1,3))
         >>> G.adj_to(1) == {2, 3}
         True
-        """
-
-        neighbours = set()
+        >>> G.adj_to(3) == {1}
+        True
+        >>> G.adj_to(4) == set()
+        True
 
-        for (x, y) in self._edges:
-            if x == v: neighbours.add(y)
-            if y == v: neighbours.add(x)
+        A vertex not in the graph has no neighbours.
 
-        return neighbours
+        Running time is O(1); the set returned is the graph's own, so
+        it should not be changed.
+        """
+        return self._adj.get(v, frozenset())
 
 
 # Utility functions that don't really belong in the class, but in a distinct
 # utility module
 
-def random_graph(n, m):
+def random_graph(n, m, seed=None):
     """
-    Generate a random graph with n vertices and m edges
+    Generate a random graph with n vertices and m edges.  The same seed
+    gives the same graph.
 
     >>> G = random_graph(5, 10)
     >>> G.num_edges()
     10
     >>> G.num_vertices()
     5
+    >>> random_graph(5, 11)
+    Traceback (most recent call last):
+    ...
+    ValueError: For 5 vertices, you wanted 11 edges, but can only have a maximum of 10
     """
     G = Graph()
     for v in range(n):
         G.add_vertex(v)
         
-    while G.num_edges() < m:
-        G.add_edge(random.sample(range(n), 2))
+    for e in randgraph.gnm_edges(n, m, seed=seed):
+        G.add_edge(e)
 
     return G
 
@@ -182,23 +248,17 @@ def spanning_edges(G, root):
     >>> lt
     [(0, 1), (1, 4), (2, 3), (2, 4), (3, 5), (5, 6)]
 
+    A root that is not in G has no tree edges
+    >>> spanning_edges(G, 99)
+    set()
+
     """
 
-    visited = set()
-    todo = [ (root, None) ]
     E = set()
-    while todo:
-        (cur, e) = todo.pop()
-        if cur in visited: continue
-
-        if e: 
+    for (v, parent, depth) in traverse.dfs(G.adj_to, root):
+        if parent is not None: 
             # return cannonical form of the edge
-            E.add( (min(e), max(e) ) )
-        visited.add(cur)
-
-        for n in G.adj_to(cur):
-            if n not in visited:
-                todo.append((n, (cur, n)))
+            E.add( (min(v, parent), max(v, parent) ) )
     return E
 
 ## Quiz 4 starts here
@@ -258,40 +318,29 @@ def connected_components(G):
     True
     
     """
-    # start with empty list of components
+    # Every vertex is visited once, in sorted order, so the components
+    # come out already ordered by their minimum vertex and the result
+    # does not depend on chance.  One visited set is shared by all the
+    # searches.
+    visited = set()
     C = []
-    # the number of items within all the sets of C
-    lenC = 0
-    # vertices not yet in C
-    unaccountedFor = copy.deepcopy(G._vertices)
-    while lenC < len(G._vertices):
-        # start with any random vertex not yet accounted for
-        root = random.sample(unaccountedFor, 1)[0]
-        # run through the spanning tree code, more or less
-        visited = set()
-        todo = [ (root, None) ]
-        E = set()
-        while todo:
-            (cur, e) = todo.pop()
-            if cur in visited: continue
-
-            if e: 
-                # return cannonical form of the edge
-                E.add( (min(e), max(e) ) )
-            visited.add(cur)
-            # vertices in visited will soon be accounted for
-            unaccountedFor.remove(cur)
-            # and therefore lenC will grow by 1 vertice
-            lenC += 1
+    for root in sorted(G.get_vertices()):
+        if root in visited: continue
 
+        # depth first search from root, much like spanning_edges
+        component = { root }
+        visited.add(root)
+        todo = [ root ]
+        while todo:
+            cur = todo.pop()
             for n in G.adj_to(cur):
                 if n not in visited:
-                    todo.append((n, (cur, n)))
-        # each spanning tree is a set for C
-        C.append(visited)
-            
-    # sort the components list by the min on each element
-    C.sort(key=min)
+                    visited.add(n)
+                    component.add(n)
+                    todo.append(n)
+
+        C.append(component)
+
     return C
 
 
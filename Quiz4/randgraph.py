@@ -0,0 +1,61 @@
+"""
+Random undirected graphs for random_graph in graph.py.
+
+This is Quiz4's cut down copy of feb15/randgraph.py: only the
+undirected G(n, m) generator, which is all graph.py uses.
+
+The vertices are 0 .. n-1.  The possible edges (u, v) with u < v are
+numbered 0 .. N-1, where N = n(n-1)/2, and a random graph is a random
+set of those numbers decoded back into edges.  Generation takes
+O(n + m) time for m edges.
+
+>>> e = gnm_edges(10, 30, seed=1)
+>>> len(e) == len(set(e)) == 30
+True
+>>> all(0 <= u < v < 10 for (u, v) in e)
+True
+>>> sorted(gnm_edges(3, 3))
+[(0, 1), (0, 2), (1, 2)]
+>>> gnm_edges(3, 4)
+Traceback (most recent call last):
+...
+ValueError: For 3 vertices, you wanted 4 edges, but can only have a maximum of 3
+"""
+
+import math
+import random
+
+def edge_number(i):
+    """
+    Returns edge number i.  Edge (u, v) with u < v is numbered
+    v(v-1)/2 + u, which does not depend on the number of vertices.
+
+    >>> [ edge_number(i) for i in range(6) ]
+    [(0, 1), (0, 2), (1, 2), (0, 3), (1, 3), (2, 3)]
+    """
+    v = (1 + math.isqrt(1 + 8 * i)) // 2
+    return (i - v * (v - 1) // 2, v)
+
+def gnm_edges(n, m, seed=None):
+    """
+    Returns a list of m distinct random edges (u, v), u < v, on the
+    vertices 0 .. n-1.
+    """
+    N = n * (n - 1) // 2
+    if m > N:
+        raise ValueError("For {} vertices, you wanted {} edges, but can only have a maximum of {}".format(n, m, N))
+    rng = random.Random(seed)
+
+    if m <= N // 2:
+        # random.sample of a range only remembers what it picked
+        numbers = rng.sample(range(N), m)
+    else:
+        # dense graph: pick the N - m edges to leave out
+        left_out = set(rng.sample(range(N), N - m))
+        numbers = [ i for i in range(N) if i not in left_out ]
+
+    return [ edge_number(i) for i in numbers ]
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,43 @@
+"""
+Depth first search as a generator, for spanning_edges in graph.py.
+
+This is Quiz4's cut down copy of feb15/traverse.py, with only the depth
+first search that graph.py uses.
+
+The search generates one (vertex, parent, depth) event for every vertex
+reachable from root, in the order the search reaches it.  The root
+comes first, with parent None and depth 0.  The (parent, vertex) pairs
+are the edges of a spanning tree.  adj is a function returning the
+neighbours of a vertex, such as G.adj_to.
+
+>>> adj = { 0: [1, 2], 1: [3], 2: [3, 4], 3: [0], 4: [], 5: [0] }
+>>> list(dfs(adj.get, 0))
+[(0, None, 0), (2, 0, 1), (4, 2, 2), (3, 2, 2), (1, 0, 1)]
+"""
+
+def dfs(adj, root):
+    """
+    Generates the (vertex, parent, depth) events of a depth first
+    search from root.
+
+    All the unvisited neighbours of a vertex are pushed on the stack
+    when it is visited, and a vertex is only visited when it comes off
+    the top, so the neighbour pushed last is followed first.  The time
+    is O(n + m).
+    """
+    visited = set()
+    todo = [ (root, None, 0) ]
+
+    while todo:
+        (cur, parent, depth) = todo.pop()
+        if cur in visited: continue
+        visited.add(cur)
+        yield (cur, parent, depth)
+
+        for n in adj(cur):
+            if n not in visited:
+                todo.append((n, cur, depth + 1))
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
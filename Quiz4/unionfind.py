@@ -0,0 +1,137 @@
+"""
+Union-find (disjoint sets) for tracking the connected components of a
+graph as edges are added.
+
+Each component is a tree of vertices whose root names the component.
+find follows a vertex up to its root and then points every vertex it
+passed straight at the root (path compression).  union hangs the root
+of the shorter tree under the root of the taller one (union by rank).
+Together they make find and union take nearly constant time.
+
+Each root also keeps the set of vertices in its component and the
+smallest of them.  On a union the smaller set is merged into the larger
+one, so no vertex is copied more than log n times in all.
+
+>>> U = UnionFind()
+>>> for v in range(6): U.add(v)
+>>> U.union(4, 1)
+>>> U.union(5, 4)
+>>> U.same(1, 5)
+True
+>>> U.same(0, 1)
+False
+>>> U.component_of(4) == {1, 4, 5}
+True
+>>> U.components()
+[{0}, {1, 4, 5}, {2}, {3}]
+>>> U.union(3, 0)
+>>> U.components()
+[{0, 3}, {1, 4, 5}, {2}]
+>>> len(U)
+3
+"""
+
+class UnionFind:
+    def __init__(self):
+        self._parent = {}
+        self._rank = {}
+        # root -> set of the vertices in its component
+        self._members = {}
+        # root -> smallest vertex in its component
+        self._min = {}
+        # components(), kept until the next add or union changes it
+        self._sorted = None
+
+    def __len__(self):
+        """
+        The number of components.
+        """
+        return len(self._members)
+
+    def __contains__(self, v):
+        return v in self._parent
+
+    def add(self, v):
+        """
+        Adds v as a component of its own, if it is not there already.
+        """
+        if v not in self._parent:
+            self._parent[v] = v
+            self._rank[v] = 0
+            self._members[v] = {v}
+            self._min[v] = v
+            self._sorted = None
+
+    def find(self, v):
+        """
+        Returns the root of the component containing v.
+        """
+        parent = self._parent
+        root = v
+        while parent[root] != root:
+            root = parent[root]
+        # path compression
+        while parent[v] != root:
+            (parent[v], v) = (root, parent[v])
+        return root
+
+    def union(self, x, y):
+        """
+        Joins the components containing x and y.  Both must be added.
+        """
+        x = self.find(x)
+        y = self.find(y)
+        if x == y:
+            return
+
+        if self._rank[x] < self._rank[y]:
+            (x, y) = (y, x)
+        self._parent[y] = x
+        if self._rank[x] == self._rank[y]:
+            self._rank[x] += 1
+
+        # x is now the root, keep the bigger member set
+        (mx, my) = (self._members[x], self._members.pop(y))
+        if len(mx) < len(my):
+            (mx, my) = (my, mx)
+        mx.update(my)
+        self._members[x] = mx
+        self._min[x] = min(self._min[x], self._min.pop(y))
+        self._sorted = None
+
+    def same(self, x, y):
+        """
+        Returns True if x and y are in the same component.
+        """
+        return self.find(x) == self.find(y)
+
+    def component_of(self, v):
+        """
+        Returns the set of vertices in the component of v.  It is the
+        tracker's own set, so it should not be changed.
+        """
+        return self._members[self.find(v)]
+
+    def components(self):
+        """
+        Returns a list of the components, each a new set of vertices,
+        ordered by the smallest vertex in each.  The order is only
+        worked out again after the components change.
+
+        The sets are copies, so changing them does not affect the
+        tracker.
+
+        >>> U = UnionFind()
+        >>> for v in range(3): U.add(v)
+        >>> U.components()[0].add(7)
+        >>> U.components()
+        [{0}, {1}, {2}]
+        """
+        if self._sorted is None:
+            roots = sorted(self._members, key=self._min.get)
+            self._sorted = [ self._members[r] for r in roots ]
+        return [ set(c) for c in self._sorted ]
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -3,6 +3,7 @@ import display
 import time
 import random
 import sys
+import traverse
 
 """
 Example of using breadth first search (BFS) to find a spanning tree
@@ -73,48 +74,27 @@ print("Spanning tree rooted at {}".format(root) )
 display.write_dot_desc(G, dot_file_name, attr)
 display.pause(0)
 
-# visited set, start with root being visited
-visited = set([root])
-visit_queue = [ root ]
+# the search itself is in traverse.bfs, which hands back each vertex as
+# it is reached, along with the vertex it was reached from and its depth
+# in the spanning tree.  Here we just draw them as they come.
+neighbours = lambda v: graph.neighbours_of(G, v)
 edge_seq_num = 0
-level = { root: 0}
 
-while visit_queue:
-    print("visited:" + str(visited))
-    print("visit queue:" + str(visit_queue))
+for (w, v, depth) in traverse.bfs(neighbours, root):
+    # the root is already drawn
+    if v is None: continue
 
-    # get the head of the queue, but don't remove
-    v = visit_queue[-1]
+    print("visiting {} from {} at step {}".format(w, v, edge_seq_num))
 
-    # find unvisited neighbour of v
-    w = None
-    for x in graph.neighbours_of(G, v):
-        if x not in visited:
-            w = x
-            break
+    # color and label the visited vertex
+    attr["vertex_color"][w]="orange"
+    attr["vertex_label"][w]= str(w) + ":" + str(depth)
 
-    if w is not None:
-        # mark w as visited
-        visited.add(w)
+    # color the new edge v, w 
+    attr["edge_label"][graph.mk_edge(v, w)]=edge_seq_num
+    edge_seq_num += 1
+    attr["edge_color"][graph.mk_edge(v, w)]="orange"
 
-        print("visiting {} at step {}".format(w, edge_seq_num))
-        level[w] = level[v] + 1
-
-        # color and label the visited vertex
-        attr["vertex_color"][w]="orange"
-        attr["vertex_label"][w]= str(w) + ":" + str(level[w])
-
-        # color the new edge v, w 
-        attr["edge_label"][graph.mk_edge(v, w)]=edge_seq_num
-        edge_seq_num += 1
-        attr["edge_color"][graph.mk_edge(v, w)]="orange"
-
-        # update the rendering
-        display.write_dot_desc(G, dot_file_name, attr)
-        display.pause(0)
-
-        # add w to visit queue
-        visit_queue.insert(0, w)
-    else:
-        # no unvisited neighbours, back track 
-        visit_queue.pop()
+    # update the rendering
+    display.write_dot_desc(G, dot_file_name, attr)
+    display.pause(0)
@@ -8,9 +8,116 @@ unorderd pairs (v, w) where v, w in V
 Note: do we want to adopt some convention
 for orering of vertices in tuple?
 
+A Graph(V, E) is still the tuple (V, E), but it also remembers the
+neighbours of each vertex, so neighbours_of does not have to look
+through all of E.
+
 """
 import random
 
+class ChangeCountingSet(set):
+    """
+    A set that counts how many times it has been changed, so that
+    anything worked out from it can tell when it is out of date.
+
+    >>> S = ChangeCountingSet({1, 2})
+    >>> S.add(3)
+    >>> S -= {1}
+    >>> (S, S.changes)
+    ({2, 3}, 2)
+    """
+    def __init__(self, *args):
+        super().__init__(*args)
+        self.changes = 0
+
+    def __repr__(self):
+        # print like a plain set
+        return repr(set(self))
+
+def _counting(name):
+    method = getattr(set, name)
+    def counted(self, *args):
+        result = method(self, *args)
+        self.changes += 1
+        return result
+    counted.__name__ = name
+    return counted
+
+for _name in ("add", "discard", "remove", "pop", "clear", "update",
+              "difference_update", "intersection_update",
+              "symmetric_difference_update",
+              "__ior__", "__iand__", "__isub__", "__ixor__"):
+    setattr(ChangeCountingSet, _name, _counting(_name))
+
+class Graph(tuple):
+    """
+    The graph (V, E), with the neighbours of each vertex kept alongside.
+    It unpacks and indexes just like the plain tuple.
+
+    V and E are copied into ChangeCountingSets, so any change made to
+    them, through add_edge or directly, is noticed and the neighbours
+    are worked out again before they are next looked up.
+
+    >>> G = Graph({1, 2, 3}, { (1, 2), (1, 3) })
+    >>> (V, E) = G
+    >>> (V, E)
+    ({1, 2, 3}, {(1, 2), (1, 3)})
+    >>> G.neighbours(1) == {2, 3}
+    True
+    >>> G.add_edge(3, 4)
+    >>> (G[0], G.neighbours(4))
+    ({1, 2, 3, 4}, {3})
+    >>> E.remove((1, 3))
+    >>> E.add((2, 3))
+    >>> (G.neighbours(1), G.neighbours(2) == {1, 3})
+    ({2}, True)
+    >>> G.neighbours(9)
+    set()
+    """
+    def __new__(cls, V, E):
+        return super().__new__(cls, (ChangeCountingSet(V), ChangeCountingSet(E)))
+
+    def __init__(self, V, E):
+        self._build()
+
+    def _build(self):
+        (V, E) = self
+        adj = { v: set() for v in V }
+        for (x, y) in E:
+            adj.setdefault(x, set()).add(y)
+            adj.setdefault(y, set()).add(x)
+        self._adj = adj
+        self._seen = (V.changes, E.changes)
+
+    def _check(self):
+        (V, E) = self
+        if self._seen != (V.changes, E.changes):
+            self._build()
+
+    def add_edge(self, x, y):
+        """
+        Adds the edge {x, y}, and x and y if they are new vertices.
+        """
+        self._check()
+        (V, E) = self
+        V.add(x)
+        V.add(y)
+        E.add(mk_edge(x, y))
+        self._adj.setdefault(x, set()).add(y)
+        self._adj.setdefault(y, set()).add(x)
+        self._seen = (V.changes, E.changes)
+
+    def neighbours(self, v):
+        """
+        Returns the set of neighbours of v, in O(1) time, or an empty
+        set if v is not a vertex.  The set belongs to the graph, so it
+        should not be changed.
+        """
+        self._check()
+        if v in self._adj:
+            return self._adj[v]
+        return set()
+
 def print_graph(G):
     print(G)
 
@@ -43,11 +150,19 @@ def neighbours_of(G, v):
     return the set of neighbours of vertex v in G
     w is a neighbour of v if exists a edge {w, v} in E
 
+    For a Graph this takes O(1) time, for a plain tuple it goes through
+    all of E.
+
     >>> G = ( {1, 2, 3}, { (1, 2), (1, 3) } )
     >>> neighbours_of(G, 1) == {2, 3}
     True
+    >>> neighbours_of(Graph(*G), 1) == {2, 3}
+    True
     """
 
+    if isinstance(G, Graph):
+        return G.neighbours(v)
+
     (V, E) = G
     neighbours = set()
 
@@ -59,16 +174,32 @@ def neighbours_of(G, v):
         
 
 def generate_random_graph(n, m):
+    """
+    Returns a random Graph with vertices 0 .. n-1 and m edges.
+
+    >>> (V, E) = generate_random_graph(10, 20)
+    >>> (len(V), len(E))
+    (10, 20)
+    >>> generate_random_graph(4, 7)
+    Traceback (most recent call last):
+    ...
+    ValueError: For 4 vertices, you wanted 7 edges, but can only have a maximum of 6
+    """
+    max_num_edges = n * (n-1) // 2
+    if m > max_num_edges:
+        raise ValueError("For {} vertices, you wanted {} edges, but can only have a maximum of {}".format(n, m, max_num_edges))
+
     V = set(range(n))
     E = set()
     while len(E) < m:
         # add a random edge to E
         # old: E.add(tuple(random.sample(V, 2)))
 
-        pair = random.sample(V, 2)
+        # random.sample needs a sequence, not the set V
+        pair = random.sample(range(n), 2)
         E.add( mk_edge(pair[0], pair[1]) )
 
-    return (V, E)
+    return Graph(V, E)
 
 if __name__ == "__main__":
     import doctest
@@ -0,0 +1,96 @@
+"""
+Route server for the Edmonton road graph that many clients can use at
+the same time over TCP.
+
+    python3 aserver.py [ --graph file ] [ --host name ] [ --port int ]
+        [ --workers int ]
+
+Speaks the same line protocol as server.py: a client sends trips
+    start dest
+one per line, and gets back one line per trip with the vertices of a
+least cost path separated by spaces, "no path", or "error: ..." for a
+line that is not a trip.  A one to many trip "start dest1 dest2 ..."
+gets one line per destination.  A client may send more trips before the
+answers come back; answers are sent in the order the trips were sent.
+
+Connections are handled by asyncio.  The path searches run in a pool of
+worker processes (--workers, default one per cpu), so a slow query only
+holds up its own client and the server keeps accepting and answering
+others.
+"""
+
+import asyncio
+import concurrent.futures
+import multiprocessing
+import os
+import sys
+
+import server
+
+async def handle_client(reader, writer, pool):
+    loop = asyncio.get_running_loop()
+    try:
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            line = line.decode()
+            if not line.strip(): continue
+            try:
+                trip = server.parse_trip(line)
+            except ValueError as err:
+                answer = "error: {}".format(err)
+            else:
+                paths = await loop.run_in_executor(pool, server.solve, trip)
+                answer = "\n".join(server.format_path(p) for p in paths)
+            writer.write((answer + "\n").encode())
+            await writer.drain()
+    except ConnectionError:
+        pass
+    finally:
+        writer.close()
+
+async def serve(host, port, pool):
+    listener = await asyncio.start_server(
+        lambda r, w: handle_client(r, w, pool), host, port)
+    for sock in listener.sockets:
+        print("serving on {}".format(sock.getsockname()), flush=True)
+    async with listener:
+        await listener.serve_forever()
+
+if __name__ == "__main__":
+    graph_file = None
+    host = "localhost"
+    port = 8888
+    workers = None
+
+    argv = sys.argv[1:]
+    while argv:
+        token = argv.pop(0)
+        if token == "--graph":
+            graph_file = argv.pop(0)
+        elif token == "--host":
+            host = argv.pop(0)
+        elif token == "--port":
+            port = int(argv.pop(0))
+        elif token == "--workers":
+            workers = int(argv.pop(0))
+        else:
+            print("Bad argument {}".format(token))
+            sys.exit(1)
+
+    server.load_graph(graph_file)
+
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+    else:
+        context = multiprocessing.get_context()
+    pool = concurrent.futures.ProcessPoolExecutor(
+        workers or os.cpu_count() or 1, context,
+        server._init_worker, (graph_file, server.cache.maxsize))
+    try:
+        asyncio.run(serve(host, port, pool))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        pool.shutdown()
@@ -0,0 +1,62 @@
+"""
+Throughput of the batch route solver for different numbers of workers.
+
+python3 bench_batch.py [ --graph file ] [ --seed int ] [ --trips int ]
+
+Solves the same random trips serially and then with 1, 2, 4, ... worker
+processes up to the number of cpus, and checks every run gives the same
+answers.
+"""
+
+import os
+import random
+import sys
+import time
+
+import server
+
+graph_file = None
+seed = None
+num_trips = 2000
+
+argv = sys.argv[1:]
+while argv:
+    token = argv.pop(0)
+    if token == "--graph":
+        graph_file = argv.pop(0)
+    elif token == "--seed":
+        seed = int(argv.pop(0))
+    elif token == "--trips":
+        num_trips = int(argv.pop(0))
+    else:
+        print("Bad argument {}".format(token))
+        sys.exit(1)
+
+if seed is not None:
+    random.seed(seed)
+
+# no route cache, so every run really solves every trip
+server.load_graph(graph_file, 0)
+vertex_list = sorted(server.V)
+trips = [ (random.choice(vertex_list), random.choice(vertex_list))
+          for i in range(num_trips) ]
+
+t = time.perf_counter()
+expected = [ server.solve(trip) for trip in trips ]
+serial = time.perf_counter() - t
+print("{:>10}: {:8.1f} trips/s".format("serial", num_trips / serial))
+
+workers = 1
+cpus = os.cpu_count() or 1
+while True:
+    t = time.perf_counter()
+    paths = list(server.batch_routes(trips, workers, graph_file))
+    elapsed = time.perf_counter() - t
+    if paths != expected:
+        print("MISMATCH with {} workers".format(workers))
+        sys.exit(1)
+    print("{:>10}: {:8.1f} trips/s  {:5.2f}x serial".format(
+        "{} workers".format(workers), num_trips / elapsed, serial / elapsed))
+    if workers >= cpus:
+        break
+    workers = min(2 * workers, cpus)
@@ -0,0 +1,98 @@
+"""
+Load generator for aserver.py.
+
+    python3 loadgen.py [ --graph file ] [ --host name ] [ --port int ]
+        [ --clients int ] [ --trips int ] [ --seed int ]
+
+Opens --clients connections at once, and each one sends --trips random
+trips, waiting for each answer before sending the next.  Reports the
+p50 and p99 latency of a single trip and the total queries per second.
+"""
+
+import asyncio
+import os
+import random
+import sys
+import time
+
+# the road graph code lives in feb15
+FEB15_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "feb15")
+sys.path.insert(0, FEB15_DIR)
+import digraph
+
+async def client(host, port, trips, latencies):
+    (reader, writer) = await asyncio.open_connection(host, port)
+    for (start, dest) in trips:
+        t = time.perf_counter()
+        writer.write("{} {}\n".format(start, dest).encode())
+        await writer.drain()
+        answer = await reader.readline()
+        latencies.append(time.perf_counter() - t)
+        if not answer or answer.startswith(b"error"):
+            raise Exception("bad answer to {} {}: {!r}".format(start, dest, answer))
+    writer.close()
+    await writer.wait_closed()
+
+def percentile(values, p):
+    """
+    The value below which p percent of the sorted values fall.
+
+    >>> percentile([4, 1, 3, 2], 50)
+    2
+    >>> percentile(list(range(1, 101)), 99)
+    99
+    """
+    values = sorted(values)
+    i = max(0, min(len(values) - 1, int(round(p / 100 * len(values))) - 1))
+    return values[i]
+
+async def main(host, port, all_trips):
+    latencies = []
+    t = time.perf_counter()
+    await asyncio.gather(*[ client(host, port, trips, latencies)
+                            for trips in all_trips ])
+    elapsed = time.perf_counter() - t
+    return (latencies, elapsed)
+
+if __name__ == "__main__":
+    # the same default graph as server.py
+    graph_file = os.path.join(FEB15_DIR, digraph.EDMONTON_FILE)
+    host = "localhost"
+    port = 8888
+    num_clients = 20
+    num_trips = 50
+    seed = None
+
+    argv = sys.argv[1:]
+    while argv:
+        token = argv.pop(0)
+        if token == "--graph":
+            graph_file = argv.pop(0)
+        elif token == "--host":
+            host = argv.pop(0)
+        elif token == "--port":
+            port = int(argv.pop(0))
+        elif token == "--clients":
+            num_clients = int(argv.pop(0))
+        elif token == "--trips":
+            num_trips = int(argv.pop(0))
+        elif token == "--seed":
+            seed = int(argv.pop(0))
+        else:
+            print("Bad argument {}".format(token))
+            sys.exit(1)
+
+    if seed is not None:
+        random.seed(seed)
+
+    vertex_list = sorted(digraph.load_edmonton(graph_file).vertices())
+    all_trips = [ [ (random.choice(vertex_list), random.choice(vertex_list))
+                    for i in range(num_trips) ]
+                  for c in range(num_clients) ]
+
+    (latencies, elapsed) = asyncio.run(main(host, port, all_trips))
+
+    print("{} clients x {} trips".format(num_clients, num_trips))
+    print("p50 latency: {:8.2f}ms".format(1000 * percentile(latencies, 50)))
+    print("p99 latency: {:8.2f}ms".format(1000 * percentile(latencies, 99)))
+    print("throughput:  {:8.1f} queries/s".format(len(latencies) / elapsed))
@@ -1,10 +1,19 @@
 """
-Priority queue implemented with dictionaries.  Stores a set of keys
+Priority queue implemented with a binary heap.  Stores a set of keys
 and associated priorities.
 
+PQueue(pairs=None)
+  Creates a priority queue.  If pairs is given, it is an iterable of
+  (key, priority) tuples that are loaded in one heapify pass, which is
+  O(n) instead of O(n log n) for n calls to update.  If a key appears
+  more than once, its lowest priority is kept.
+
 pop_smallest()
   Removes the key with the smallest priority and return a tuple
-  with the key and priority.
+  with the key and priority.  Raises IndexError if the queue is empty.
+
+peek()
+  Returns the same tuple as pop_smallest() but does not remove it.
 
 update(key, priority)
   If priority is lower than the associated priority of key, then
@@ -17,6 +26,14 @@ update(key, priority)
 is_empty()
   Returns True if empty, else False
 
+len(q)
+  The number of keys in the queue.
+
+Implementation note: decrease-key is done by lazy invalidation.  The
+old heap entry for the key is marked dead and a new entry is pushed.
+Dead entries are thrown away when they reach the top of the heap, so
+pop_smallest() and update() are O(log n) amortized.
+
 >>> q = PQueue()
 >>> q.is_empty()
 True
@@ -29,30 +46,92 @@ False
 >>> q.update("thing", 100)
 >>> q.update("something else", 110)
 >>> q.update("something else", 8)
+>>> len(q)
+2
+>>> q.peek()
+('thing', 5)
 >>> q.pop_smallest()
 ('thing', 5)
 >>> q.pop_smallest()
 ('something else', 8)
 >>> q.is_empty()
 True
+>>> q.pop_smallest()
+Traceback (most recent call last):
+...
+IndexError: pop from an empty priority queue
 
+Bulk construction:
+>>> q = PQueue([("a", 3), ("b", 1), ("c", 2), ("a", 0)])
+>>> len(q)
+3
+>>> [q.pop_smallest() for i in range(len(q))]
+[('a', 0), ('b', 1), ('c', 2)]
 """
 
+import heapq
+import itertools
+
+# marks a heap entry whose key has since been given a lower priority
+_DEAD = object()
+
 class PQueue:
-    def __init__(self):
-        self._q = {}
+    def __init__(self, pairs=None):
+        # heap of [priority, sequence number, key] entries, the sequence
+        # number breaks ties so keys themselves never get compared
+        self._heap = []
+        # key -> its live entry in the heap
+        self._entries = {}
+        self._counter = itertools.count()
+
+        if pairs:
+            for (key, priority) in pairs:
+                if key in self._entries:
+                    entry = self._entries[key]
+                    if priority < entry[0]:
+                        entry[0] = priority
+                else:
+                    entry = [priority, next(self._counter), key]
+                    self._entries[key] = entry
+                    self._heap.append(entry)
+            heapq.heapify(self._heap)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _discard_dead(self):
+        heap = self._heap
+        while heap and heap[0][2] is _DEAD:
+            heapq.heappop(heap)
+
+    def peek(self):
+        self._discard_dead()
+        if not self._heap:
+            raise IndexError("peek at an empty priority queue")
+        (p, count, k) = self._heap[0]
+        return (k, p)
 
     def pop_smallest(self):
-        k = min(self._q, key=self._q.get)
-        p = self._q.pop(k)
+        self._discard_dead()
+        if not self._heap:
+            raise IndexError("pop from an empty priority queue")
+        (p, count, k) = heapq.heappop(self._heap)
+        del self._entries[k]
         return (k, p)
 
     def update(self, key, priority):
-        if key not in self._q or self._q[key] > priority:
-            self._q[key] = priority
+        entry = self._entries.get(key)
+        if entry is not None:
+            if priority >= entry[0]:
+                return
+            entry[2] = _DEAD
+
+        entry = [priority, next(self._counter), key]
+        self._entries[key] = entry
+        heapq.heappush(self._heap, entry)
 
     def is_empty(self):
-        if self._q:
+        if self._entries:
             return False
         else:
             return True
@@ -1,29 +1,275 @@
+"""
+Route server for the Edmonton road graph.
 
-def least_cost_path(G, start, dest, cost):
-    todo = {start: 0}
-    parent = {}
-    visited = set()
-    while todo and dest not in visited:
-        cur = min(todo, key=todo.get)
-        c = todo[cur]
-        todo.pop(cur)
-        visited.add(cur)
-        for n in G.adj_to(cur):
-            if n in visited: continue
-            if n not in todo or ( c + cost((cur,n), V) < todo[n] ):
-                todo[n] = c + cost((cur,n), V)
-                parent[n] = cur
-    if dest in visited:
-        path = []
-        while start not in path:
-            path.insert(0, parent[cur])
-            cur = parent[cur]
-        return path
+    python3 server.py [ --graph file ] [ --batch ] [ --workers int ]
+        [ --cache int ]
+
+The graph defaults to edmonton-roads-digraph.txt in feb15, wherever the
+server is run from.
+
+Reads trips from stdin, one per line, as two vertex ids
+    start dest
+and answers each with a line holding the vertices of a least cost path
+from start to dest separated by spaces, "no path", or "error: ..." for
+a line that is not a trip.
+
+A line can also name several destinations for the same start
+    start dest1 dest2 ...
+and gets one answer line per destination, in order.  All of them are
+read off a single shortest path tree from start.
+
+A trip can also be given as raw coordinates
+    start_lat start_lon dest_lat dest_lon
+when the four numbers are not all integers, or with each point marked
+    @start_lat,start_lon @dest_lat,dest_lon
+which is needed for whole degree coordinates, as four integers are a
+one to many trip.  Each point is snapped to the nearest vertex of the
+road graph first.
+
+By default each trip is answered as soon as it is read.  With --batch
+all of stdin is read first and the trips are shared out over a pool of
+worker processes (--workers, default one per cpu).  The answers are
+printed in the same order as the trips.
+
+Answers for the most recent --cache (default 10000) distinct trips are
+remembered, in each worker process separately.
+"""
+
+import multiprocessing
+import os
+import sys
+
+# the road graph and least cost path code lives in feb15
+FEB15_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "feb15")
+sys.path.insert(0, FEB15_DIR)
+import digraph
+from dijkstra import shortest_path_tree
+from kdtree import KDTree
+from routecache import RouteCache
+
+# the road graph used when no graph file is given
+GRAPH_FILE = os.path.join(FEB15_DIR, digraph.EDMONTON_FILE)
+
+# the road graph and the cache of recent answers, set up by load_graph
+# in this process and inherited by (or reloaded in) every worker process
+G = None
+V = None
+cache = None
+# spatial index of V, built the first time a coordinate trip comes in
+locator = None
+
+def load_graph(graph_file=None, cache_size=10000):
+    """
+    Loads the road graph (default GRAPH_FILE) into the module globals G
+    and V, and starts an empty route cache holding up to cache_size
+    answers.
+    """
+    global G, V, cache
+    if graph_file is None:
+        graph_file = GRAPH_FILE
+    G = digraph.load_edmonton(graph_file)
+    V = digraph.vertices
+    cache = RouteCache(G, cost, cache_size)
+
+def cost(e):
+    return digraph.cost(e, V)
+
+def parse_trip(line):
+    """
+    Returns the (start, dest) pair on a trip line, or the tuple
+    (start, dest1, dest2, ...) for a one to many trip.
+
+    >>> parse_trip("1 2")
+    (1, 2)
+    >>> parse_trip("  29577354   29770958 \\n")
+    (29577354, 29770958)
+    >>> parse_trip("1 2 3")
+    (1, 2, 3)
+    >>> parse_trip("53.5 -113.5 53.6 -113.4")
+    ((53.5, -113.5), (53.6, -113.4))
+    >>> parse_trip("53 -113.5 54 -113")
+    ((53.0, -113.5), (54.0, -113.0))
+
+    Four integers are vertex ids; whole degree coordinates need @
+    >>> parse_trip("53 -113 54 -113")
+    (53, -113, 54, -113)
+    >>> parse_trip("@53,-113 @54,-113")
+    ((53.0, -113.0), (54.0, -113.0))
+
+    >>> parse_trip("1")
+    Traceback (most recent call last):
+    ...
+    ValueError: a trip is a start and at least one dest vertex id, got '1'
+    >>> parse_trip("53.5 -113.5 53.6")
+    Traceback (most recent call last):
+    ...
+    ValueError: a coordinate trip is four numbers, got '53.5 -113.5 53.6'
+    >>> parse_trip("@53,-113 54 -113")
+    Traceback (most recent call last):
+    ...
+    ValueError: a marked coordinate trip is two @lat,lon points, got '@53,-113 54 -113'
+    """
+    trip = line.split()
+    if len(trip) < 2:
+        raise ValueError("a trip is a start and at least one dest vertex id, got {!r}".format(line.strip()))
+
+    if any(x.startswith("@") for x in trip):
+        if len(trip) != 2 or not all(x.startswith("@") for x in trip):
+            raise ValueError("a marked coordinate trip is two @lat,lon points, got {!r}".format(line.strip()))
+        return tuple(_parse_point(x) for x in trip)
+
+    try:
+        return tuple(int(v) for v in trip)
+    except ValueError:
+        pass
+    # not all vertex ids, so it has to be lat lon lat lon
+    if len(trip) != 4:
+        raise ValueError("a coordinate trip is four numbers, got {!r}".format(line.strip()))
+    (a, b, c, d) = [ float(x) for x in trip ]
+    return ((a, b), (c, d))
+
+def _parse_point(field):
+    """
+    Returns the (lat, lon) of a "@lat,lon" field.
+
+    >>> _parse_point("@53.5,-113")
+    (53.5, -113.0)
+    >>> _parse_point("@53.5")
+    Traceback (most recent call last):
+    ...
+    ValueError: a coordinate point is @lat,lon, got '@53.5'
+    """
+    coords = field[1:].split(",")
+    if len(coords) != 2:
+        raise ValueError("a coordinate point is @lat,lon, got {!r}".format(field))
+    return (float(coords[0]), float(coords[1]))
+
+def route(trip):
+    """
+    Returns a least cost path for the (start, dest) trip, or None.
+    Popular trips are answered from the route cache.
+    """
+    (start, dest) = trip
+    if start not in V or dest not in V:
+        return None
+    return cache.least_cost_path(start, dest)
+
+def route_many(trip):
+    """
+    Returns the list of least cost paths (or None) from trip[0] to each
+    of trip[1:], from one shortest path tree.
+    """
+    start = trip[0]
+    dests = trip[1:]
+    if start not in V:
+        return [ None for d in dests ]
+    tree = shortest_path_tree(G, start, cost, targets=[ d for d in dests if d in V ])
+    return [ tree.path_to(d) for d in dests ]
+
+def snap(points):
+    """
+    Returns the list of vertices nearest to each (lat, lon) in points.
+    """
+    global locator
+    if locator is None:
+        locator = KDTree(V)
+    return locator.nearest_many(points)
+
+def solve(trip):
+    """
+    Returns the list of answers for a trip from parse_trip: one path
+    for a plain trip, one per destination for a one to many trip.
+    """
+    if isinstance(trip[0], tuple):
+        trip = tuple(snap(trip))
+    if len(trip) == 2:
+        return [ route(trip) ]
+    return route_many(trip)
+
+def format_path(path):
+    """
+    >>> format_path([1, 2, 3])
+    '1 2 3'
+    >>> format_path(None)
+    'no path'
+    """
+    if path is None:
+        return "no path"
+    return " ".join(str(v) for v in path)
+
+def _init_worker(graph_file, cache_size):
+    # with fork the graph came along from the parent, otherwise load it
+    # once per worker rather than sending it with every trip
+    if G is None:
+        load_graph(graph_file, cache_size)
+
+def batch_routes(trips, workers=None, graph_file=None):
+    """
+    Generates the answers from solve for a list of trips, in order,
+    solving them in a pool of worker processes.  The graph must already
+    be loaded; each worker gets a route cache of the same size.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
     else:
-        return None     
+        context = multiprocessing.get_context()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    # big enough chunks that each worker is not waiting on the pipe,
+    # small enough that the pool stays balanced at the end
+    chunksize = max(1, len(trips) // (workers * 8))
+    with context.Pool(workers, _init_worker, (graph_file, cache.maxsize)) as pool:
+        for answers in pool.imap(solve, trips, chunksize):
+            yield answers
+
+if __name__ == "__main__":
+    graph_file = None
+    batch = False
+    workers = None
+    cache_size = 10000
 
-while 0:
-    trip = input('Awaiting input:').split(" ")
-    for i in range(len(trip)):
-        trip[i] = int(trip[i])
-    print(trip)
+    argv = sys.argv[1:]
+    while argv:
+        token = argv.pop(0)
+        if token == "--graph":
+            graph_file = argv.pop(0)
+        elif token == "--batch":
+            batch = True
+        elif token == "--workers":
+            workers = int(argv.pop(0))
+        elif token == "--cache":
+            cache_size = int(argv.pop(0))
+        else:
+            print("Bad argument {}".format(token))
+            sys.exit(1)
+
+    load_graph(graph_file, cache_size)
+
+    if batch:
+        # one entry per line: a trip, or the error message for a bad line
+        parsed = []
+        for line in sys.stdin:
+            if not line.strip(): continue
+            try:
+                parsed.append(parse_trip(line))
+            except ValueError as err:
+                parsed.append("error: {}".format(err))
+        trips = [ trip for trip in parsed if not isinstance(trip, str) ]
+        answers = batch_routes(trips, workers, graph_file)
+        for trip in parsed:
+            if isinstance(trip, str):
+                print(trip)
+                continue
+            for path in next(answers):
+                print(format_path(path))
+    else:
+        for line in sys.stdin:
+            if not line.strip(): continue
+            try:
+                trip = parse_trip(line)
+            except ValueError as err:
+                print("error: {}".format(err))
+            else:
+                for path in solve(trip):
+                    print(format_path(path))
+            sys.stdout.flush()
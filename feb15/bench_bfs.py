@@ -0,0 +1,69 @@
+"""
+Time shortest_path (fewest edges) on a large random digraph, one way
+and bidirectional, and report the hop counts of the paths found and
+how many vertices each search reached.
+
+python3 bench_bfs.py [ --seed int ] [ --num_v int ] [ --num_e int ]
+    [ --queries int ]
+"""
+
+import random
+import sys
+import time
+
+import digraph
+
+seed = None
+num_vertices = 200000
+num_edges = 1000000
+num_queries = 50
+
+argv = sys.argv[1:]
+while argv:
+    token = argv.pop(0)
+    if token == "--seed":
+        seed = int(argv.pop(0))
+    elif token == "--num_v":
+        num_vertices = int(argv.pop(0))
+    elif token == "--num_e":
+        num_edges = int(argv.pop(0))
+    elif token == "--queries":
+        num_queries = int(argv.pop(0))
+    else:
+        print("Bad argument {}".format(token))
+        sys.exit(1)
+
+if seed is not None:
+    random.seed(seed)
+
+t = time.perf_counter()
+G = digraph.random_graph(num_vertices, num_edges, seed=seed)
+print("{} vertices, {} edges, built in {:.1f}s".format(
+    G.num_vertices(), G.num_edges(), time.perf_counter() - t))
+
+queries = [ (random.randrange(num_vertices), random.randrange(num_vertices))
+            for i in range(num_queries) ]
+
+results = {}
+for (name, bidirectional) in (("one way", False), ("bidir", True)):
+    paths = []
+    visited = 0
+    t = time.perf_counter()
+    for (s, d) in queries:
+        stats = {}
+        paths.append(digraph.shortest_path(G, s, d, bidirectional, stats))
+        visited += stats["visited"]
+    elapsed = time.perf_counter() - t
+    results[name] = paths
+    hops = [ len(p) - 1 for p in paths if p is not None ]
+    print("{:>8}: {:8.2f}ms/query  {:9.0f} visited/query  mean hops {:.2f}".format(
+        name, elapsed / num_queries * 1000, visited / num_queries,
+        sum(hops) / max(1, len(hops))))
+
+for (p, q) in zip(results["one way"], results["bidir"]):
+    if (p is None) != (q is None) or (p is not None and
+            (len(p) != len(q) or not G.is_path(q))):
+        print("MISMATCH", p, q)
+        sys.exit(1)
+print("paths agree, {} of {} reachable".format(
+    sum(p is not None for p in results["one way"]), num_queries))
@@ -0,0 +1,88 @@
+"""
+Benchmark contraction hierarchy queries against Dijkstra on a road
+graph, checking that every path has the same cost.
+
+python3 bench_ch.py [ --seed int ] [ --queries int ] [ --ch ch-file ]
+    [ --graph file ]
+
+The graph is read from file, by default edmonton-roads-digraph.txt.
+grid-roads-test.txt is a small synthetic grid for when the Edmonton
+data is not at hand.
+
+If ch-file is given and exists it is loaded, otherwise the hierarchy is
+built first (and saved to ch-file if one was named).
+"""
+
+import os
+import random
+import sys
+import time
+
+import contraction
+import digraph
+import dijkstra
+
+seed = None
+num_queries = 1000
+ch_file_name = None
+graph_file = digraph.EDMONTON_FILE
+
+argv = sys.argv[1:]
+while argv:
+    token = argv.pop(0)
+    if token == "--seed":
+        seed = int(argv.pop(0))
+    elif token == "--queries":
+        num_queries = int(argv.pop(0))
+    elif token == "--ch":
+        ch_file_name = argv.pop(0)
+    elif token == "--graph":
+        graph_file = argv.pop(0)
+    else:
+        print("Bad argument {}".format(token))
+        sys.exit(1)
+
+if seed is not None:
+    random.seed(seed)
+
+G = digraph.load_edmonton(graph_file)
+V = digraph.vertices
+cost = lambda e: digraph.cost(e, V)
+print("{}: {} vertices, {} edges".format(
+    graph_file, G.num_vertices(), G.num_edges()))
+
+t = time.perf_counter()
+if ch_file_name and os.path.exists(ch_file_name):
+    CH = contraction.load_hierarchy(ch_file_name)
+    print("loaded hierarchy in {:.2f}s".format(time.perf_counter() - t))
+else:
+    CH = contraction.build_hierarchy(G, cost)
+    print("built hierarchy in {:.2f}s, {} shortcuts".format(
+        time.perf_counter() - t, CH.num_shortcuts()))
+    if ch_file_name:
+        CH.save(ch_file_name)
+
+vertex_list = sorted(G.vertices())
+queries = [ (random.choice(vertex_list), random.choice(vertex_list))
+            for i in range(num_queries) ]
+
+t = time.perf_counter()
+d_paths = [ dijkstra.least_cost_path(G, s, d, cost) for (s, d) in queries ]
+d_time = time.perf_counter() - t
+
+t = time.perf_counter()
+ch_paths = [ CH.least_cost_path(s, d) for (s, d) in queries ]
+ch_time = time.perf_counter() - t
+
+for ((s, d), p, q) in zip(queries, d_paths, ch_paths):
+    if (p is None) != (q is None):
+        print("MISMATCH: {} -> {} reachable by only one search".format(s, d))
+        sys.exit(1)
+    if p is not None and abs(digraph.pathcost(p, V) - digraph.pathcost(q, V)) > 1e-9:
+        print("MISMATCH: {} -> {} costs differ".format(s, d))
+        sys.exit(1)
+
+print("all {} path costs agree".format(num_queries))
+print("dijkstra: {:10.1f} queries/s".format(num_queries / d_time))
+print("ch:       {:10.1f} queries/s  ({:.3f}ms per query)".format(
+    num_queries / ch_time, 1000 * ch_time / num_queries))
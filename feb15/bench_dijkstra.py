@@ -0,0 +1,118 @@
+"""
+Benchmark the heap based least_cost_path in dijkstra.py against the
+old min()-over-dict version it replaced.
+
+python3 bench_dijkstra.py [ --seed int ] [ --num_v int ] [ --num_e int ]
+    [ --queries int ] [ --no_old ]
+
+Try with:
+    python3 bench_dijkstra.py --seed 23 --num_v 100000 --num_e 400000
+
+The old version is quadratic in the size of the frontier, so on the
+default 100k vertex graph it can take minutes per query.  Use --no_old
+to time just the new one.
+"""
+
+import random
+import sys
+import time
+
+from digraph import Digraph
+import dijkstra
+
+def old_least_cost_path(G, start, dest, cost):
+    """
+    The original implementation, kept here only to compare against.
+    """
+    todo = {start: 0}
+    parent = {}
+    visited = set()
+    while todo and dest not in visited:
+        cur = min(todo, key=todo.get)
+        c = todo[cur]
+        todo.pop(cur)
+        visited.add(cur)
+        for n in G.adj_to(cur):
+            if n in visited: continue
+            if n not in todo or ( c + cost((cur,n)) < todo[n] ):
+                todo[n] = c + cost((cur,n))
+                parent[n] = cur
+    if dest in visited:
+        path = [dest]
+        while start not in path:
+            path.insert(0, parent[cur])
+            cur = parent[cur]
+        return path
+    else:
+        return None
+
+def random_weighted_digraph(n, m):
+    """
+    Returns (G, weights) for a random digraph with n vertices, about m
+    edges and random integer edge weights.
+    """
+    weights = {}
+    while len(weights) < m:
+        u = random.randrange(n)
+        v = random.randrange(n)
+        if u != v:
+            weights[(u, v)] = random.randint(1, 100)
+    G = Digraph(weights)
+    for v in range(n):
+        G.add_vertex(v)
+    return (G, weights)
+
+def path_cost(path, weights):
+    return sum(weights[(path[i], path[i+1])] for i in range(len(path)-1))
+
+seed = None
+num_vertices = 100000
+num_edges = 400000
+num_queries = 5
+run_old = True
+
+argv = sys.argv[1:]
+while argv:
+    token = argv.pop(0)
+    if token == "--seed":
+        seed = int(argv.pop(0))
+    elif token == "--num_v":
+        num_vertices = int(argv.pop(0))
+    elif token == "--num_e":
+        num_edges = int(argv.pop(0))
+    elif token == "--queries":
+        num_queries = int(argv.pop(0))
+    elif token == "--no_old":
+        run_old = False
+    else:
+        print("Bad argument {}".format(token))
+        sys.exit(1)
+
+if seed is not None:
+    random.seed(seed)
+
+(G, weights) = random_weighted_digraph(num_vertices, num_edges)
+cost = weights.get
+queries = [ (random.randrange(num_vertices), random.randrange(num_vertices))
+            for i in range(num_queries) ]
+
+print("{} vertices, {} edges, {} queries".format(
+    G.num_vertices(), len(weights), num_queries))
+
+t = time.perf_counter()
+new_paths = [ dijkstra.least_cost_path(G, s, d, cost) for (s, d) in queries ]
+new_time = time.perf_counter() - t
+print("heap:     {:.3f}s  ({:.4f}s per query)".format(new_time, new_time / num_queries))
+
+if run_old:
+    t = time.perf_counter()
+    old_paths = [ old_least_cost_path(G, s, d, cost) for (s, d) in queries ]
+    old_time = time.perf_counter() - t
+    print("min-dict: {:.3f}s  ({:.4f}s per query)".format(old_time, old_time / num_queries))
+    print("speedup:  {:.1f}x".format(old_time / new_time))
+
+    for (p, q) in zip(new_paths, old_paths):
+        if (p is None) != (q is None) or (p and path_cost(p, weights) != path_cost(q, weights)):
+            print("MISMATCH: {} vs {}".format(p, q))
+            sys.exit(1)
+    print("path costs agree")
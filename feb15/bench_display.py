@@ -0,0 +1,145 @@
+"""
+Time writing a .dot file for a big random graph with the streaming
+write_dot_desc against the old gen_dot_desc, which built the whole
+description with += before writing it out, and check that the two
+files are byte for byte the same.
+
+python3 bench_display.py [ --seed int ] [ --num_v int ] [ --num_e int ]
+    [ --memory ]
+
+With --memory the peak memory allocated while writing is measured
+too (with tracemalloc, which makes both much slower).
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import display
+import randgraph
+
+def old_gen_dot_desc(G, graphtype='graph', attributes={}):
+    """
+    gen_dot_desc as it was before dot_lines.
+    """
+    vertex_color = attributes.get("vertex_color", {})
+    edge_color = attributes.get("edge_color", {})
+    vertex_label = attributes.get("vertex_label", {})
+    edge_label = attributes.get("edge_label", {})
+
+    (V, E) = G
+
+    edgesym = "--"
+    if graphtype != 'graph':
+        graphtype = 'digraph'
+        edgesym = "->"
+
+    dot_desc = ( graphtype +
+        " g {\n" +
+        "  ordering=out;\n" +
+        "  node [shape=circle];\n" +
+        "  edge [penwidth=3];\n"
+        )
+
+    if len(V) == 0:
+       dot_desc += "Empty [shape=ellipse];\n"
+    else:
+        for n in V:
+            color = "white"
+            if n in vertex_color:
+                color = vertex_color[n]
+
+            label = str(n)
+            if n in vertex_label:
+                label = vertex_label[n]
+
+            dot_desc += '  {v} [label="{l}", style=filled, fillcolor="{c}"];\n'.format(
+                v=str(n), l=label, c=color)
+
+        for e in E:
+            (x, y) = e
+            color = "black"
+            if e in edge_color:
+                color = edge_color[e]
+            label = ""
+            if e in edge_label:
+                label = ', label="{}"'.format(edge_label[e])
+
+            dot_desc += '  {vx} {esym} {vy} [color="{c}" {l}];\n'.format(
+                    esym=edgesym, vx=str(x), vy=str(y), c=color, l=label)
+
+    dot_desc += "}\n"
+
+    return dot_desc
+
+def old_write_dot_desc(G, file_name, graphtype='graph', attributes={}):
+    with open(file_name, 'w') as f:
+        f.write( old_gen_dot_desc(G, graphtype, attributes) )
+
+seed = None
+num_vertices = 200000
+num_edges = 1000000
+memory = False
+
+argv = sys.argv[1:]
+while argv:
+    token = argv.pop(0)
+    if token == "--seed":
+        seed = int(argv.pop(0))
+    elif token == "--num_v":
+        num_vertices = int(argv.pop(0))
+    elif token == "--num_e":
+        num_edges = int(argv.pop(0))
+    elif token == "--memory":
+        memory = True
+    else:
+        print("Bad argument {}".format(token))
+        sys.exit(1)
+
+if seed is not None:
+    random.seed(seed)
+
+V = set(range(num_vertices))
+E = set(randgraph.gnm_edges(num_vertices, num_edges, directed=False, seed=seed))
+attr = { "vertex_color": {}, "edge_color": {}, "vertex_label": {}, "edge_label": {} }
+for v in random.sample(range(num_vertices), num_vertices // 10):
+    attr["vertex_color"][v] = "orange"
+for (i, e) in enumerate(random.sample(sorted(E), num_edges // 10)):
+    attr["edge_color"][e] = "orange"
+    attr["edge_label"][e] = i
+
+print("{} vertices, {} edges".format(num_vertices, num_edges))
+
+tmpdir = tempfile.mkdtemp()
+names = {}
+for (name, write) in (("+= string", old_write_dot_desc),
+                      ("streaming", display.write_dot_desc)):
+    names[name] = os.path.join(tmpdir, name.replace(" ", "_") + ".dot")
+    if memory:
+        tracemalloc.start()
+    t = time.perf_counter()
+    write((V, E), names[name], 'graph', attr)
+    elapsed = time.perf_counter() - t
+    report = "{:>10}: {:8.2f}s".format(name, elapsed)
+    if memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        report += "  {:8.1f}MB peak".format(peak / 2**20)
+    print(report)
+
+(old_file, new_file) = names.values()
+with open(old_file, 'rb') as f:
+    old_bytes = f.read()
+with open(new_file, 'rb') as f:
+    new_bytes = f.read()
+for name in names.values():
+    os.remove(name)
+os.rmdir(tmpdir)
+
+if old_bytes != new_bytes:
+    print("MISMATCH")
+    sys.exit(1)
+print("files identical, {:.1f}MB".format(len(new_bytes) / 2**20))
@@ -0,0 +1,125 @@
+"""
+Compare memory use and traversal speed of Digraph and FrozenDigraph.
+
+python3 bench_frozen.py [ --seed int ] [ --num_v int ] [ --num_e int ]
+    [ --graph file ]
+
+Uses a random digraph, or the road graph in file with --graph (for
+example edmonton-roads-digraph.txt, or the small synthetic
+grid-roads-test.txt).  For a road graph the time to compute the edge
+costs with set_road_weights is reported too.  Traversal time is for a
+breadth first search of the whole graph from every one of 10 random
+roots.
+"""
+
+from collections import deque
+import random
+import sys
+import time
+
+from digraph import Digraph, FrozenDigraph
+import digraph
+
+def reach(G, root):
+    """
+    Number of vertices reachable from root, by breadth first search.
+    """
+    visited = { root }
+    todo = deque([ root ])
+    while todo:
+        cur = todo.popleft()
+        for n in G.adj_to(cur):
+            if n not in visited:
+                visited.add(n)
+                todo.append(n)
+    return len(visited)
+
+def reach_numbered(F, root):
+    """
+    reach on a FrozenDigraph using its vertex numbers directly.
+    """
+    visited = bytearray(F.num_vertices())
+    i = F.index[root]
+    visited[i] = 1
+    todo = deque([ i ])
+    count = 1
+    offsets = F.out_offsets
+    targets = F.out_targets
+    while todo:
+        cur = todo.popleft()
+        for j in range(offsets[cur], offsets[cur+1]):
+            n = targets[j]
+            if not visited[n]:
+                visited[n] = 1
+                count += 1
+                todo.append(n)
+    return count
+
+seed = None
+num_vertices = 100000
+num_edges = 400000
+graph_file = None
+
+argv = sys.argv[1:]
+while argv:
+    token = argv.pop(0)
+    if token == "--seed":
+        seed = int(argv.pop(0))
+    elif token == "--num_v":
+        num_vertices = int(argv.pop(0))
+    elif token == "--num_e":
+        num_edges = int(argv.pop(0))
+    elif token == "--graph":
+        graph_file = argv.pop(0)
+    else:
+        print("Bad argument {}".format(token))
+        sys.exit(1)
+
+if seed is not None:
+    random.seed(seed)
+
+if graph_file:
+    G = digraph.load_edmonton(graph_file)
+    print(graph_file)
+else:
+    edges = set()
+    while len(edges) < num_edges:
+        (u, v) = (random.randrange(num_vertices), random.randrange(num_vertices))
+        if u != v:
+            edges.add((u, v))
+    G = Digraph(edges)
+    for v in range(num_vertices):
+        G.add_vertex(v)
+
+t = time.perf_counter()
+F = FrozenDigraph(G)
+freeze_time = time.perf_counter() - t
+
+roots = random.sample(sorted(G.vertices()), 10)
+
+print("{} vertices, {} edges, frozen in {:.2f}s".format(
+    G.num_vertices(), G.num_edges(), freeze_time))
+print("{:>22}: {:10.1f} MB  {:6.1f} bytes/edge".format(
+    "Digraph", G.memory_usage() / 2**20, G.memory_usage() / G.num_edges()))
+print("{:>22}: {:10.1f} MB  {:6.1f} bytes/edge".format(
+    "FrozenDigraph", F.memory_usage() / 2**20, F.memory_usage() / F.num_edges()))
+
+if graph_file:
+    # the first edge cost computation imports numpy, time that apart
+    t = time.perf_counter()
+    np = digraph._numpy()
+    print("{:>22}: {:10.3f}s{}".format(
+        "import numpy", time.perf_counter() - t,
+        "" if np else "  (not installed)"))
+    t = time.perf_counter()
+    F.set_road_weights(digraph.vertices)
+    print("{:>22}: {:10.4f}s".format(
+        "set_road_weights", time.perf_counter() - t))
+
+for (name, graph, search) in [ ("Digraph bfs", G, reach),
+                               ("FrozenDigraph bfs", F, reach),
+                               ("numbered bfs", F, reach_numbered) ]:
+    t = time.perf_counter()
+    sizes = [ search(graph, r) for r in roots ]
+    print("{:>22}: {:10.3f}s  reached {}".format(
+        name, time.perf_counter() - t, sum(sizes)))
@@ -0,0 +1,73 @@
+"""
+Compare the cost of importing digraph with the cost of loading the
+Edmonton graph, which importing digraph used to do as a side effect.
+
+python3 bench_import.py [ --runs int ] [ --graph file ]
+
+The graph is read from file, by default edmonton-roads-digraph.txt.
+grid-roads-test.txt is a small synthetic grid for when the Edmonton
+data is not at hand; its load times are far below Edmonton's.
+
+Each measurement is a fresh python process, so the numbers include
+interpreter startup.  "import only" is what every importer of digraph
+now pays; "import + load_edmonton" is what they all paid before.  The
+load is timed both with and without the roadgraph snapshot.
+"""
+
+import os
+import subprocess
+import sys
+import time
+
+import digraph
+
+runs = 5
+graph_file = digraph.EDMONTON_FILE
+
+argv = sys.argv[1:]
+while argv:
+    token = argv.pop(0)
+    if token == "--runs":
+        runs = int(argv.pop(0))
+    elif token == "--graph":
+        graph_file = argv.pop(0)
+    else:
+        print("Bad argument {}".format(token))
+        sys.exit(1)
+
+snapshot_name = graph_file + ".snap"
+load_code = "import digraph; digraph.load_edmonton({!r})".format(graph_file)
+
+def best_time(code, before=None):
+    """
+    Runs code in a new interpreter runs times, returns the fastest.
+    before is called ahead of every run.
+    """
+    best = None
+    for i in range(runs):
+        if before:
+            before()
+        t = time.perf_counter()
+        subprocess.check_call([sys.executable, "-c", code])
+        t = time.perf_counter() - t
+        if best is None or t < best:
+            best = t
+    return best
+
+def remove_snapshot():
+    if os.path.exists(snapshot_name):
+        os.remove(snapshot_name)
+
+baseline = best_time("pass")
+import_only = best_time("import digraph")
+parse = best_time(load_code, remove_snapshot)
+# leave a snapshot in place for the next measurement
+G = digraph.load_edmonton(graph_file)
+snapshot = best_time(load_code)
+
+print("{}: {} vertices, {} edges".format(
+    graph_file, G.num_vertices(), G.num_edges()))
+print("{:>32}: {:8.1f}ms".format("python startup", 1000 * baseline))
+print("{:>32}: {:8.1f}ms".format("import only", 1000 * import_only))
+print("{:>32}: {:8.1f}ms".format("import + load_edmonton (csv)", 1000 * parse))
+print("{:>32}: {:8.1f}ms".format("import + load_edmonton (snap)", 1000 * snapshot))
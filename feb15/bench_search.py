@@ -0,0 +1,103 @@
+"""
+Check a_star_path, bidirectional_least_cost_path and
+frozen_least_cost_path (precomputed edge costs) against Dijkstra on a
+road graph and report how many vertices each search settles.
+
+python3 bench_search.py [ --seed int ] [ --queries int ] [ --graph file ]
+
+The graph is read from file, by default edmonton-roads-digraph.txt in
+the current directory.  grid-roads-test.txt is a small synthetic grid
+that can be used when the Edmonton data is not at hand.
+"""
+
+import random
+import sys
+import time
+
+import digraph
+import dijkstra
+
+seed = None
+num_queries = 20
+graph_file = digraph.EDMONTON_FILE
+
+argv = sys.argv[1:]
+while argv:
+    token = argv.pop(0)
+    if token == "--seed":
+        seed = int(argv.pop(0))
+    elif token == "--queries":
+        num_queries = int(argv.pop(0))
+    elif token == "--graph":
+        graph_file = argv.pop(0)
+    else:
+        print("Bad argument {}".format(token))
+        sys.exit(1)
+
+if seed is not None:
+    random.seed(seed)
+
+G = digraph.load_edmonton(graph_file)
+V = digraph.vertices
+cost = lambda e: digraph.cost(e, V)
+vertex_list = sorted(G.vertices())
+print("{}: {} vertices, {} edges".format(
+    graph_file, G.num_vertices(), G.num_edges()))
+
+t = time.perf_counter()
+F = digraph.FrozenDigraph(G)
+F.set_road_weights(V)
+print("froze graph and computed {} edge costs in {:.3f}s{}".format(
+    F.num_edges(), time.perf_counter() - t,
+    "" if digraph._numpy() else " (without numpy)"))
+print()
+
+searches = [
+    ("dijkstra", lambda s, d, stats: dijkstra.least_cost_path(G, s, d, cost, stats)),
+    ("a*", lambda s, d, stats: dijkstra.a_star_path(G, s, d, V, stats)),
+    ("bidir", lambda s, d, stats: dijkstra.bidirectional_least_cost_path(G, s, d, cost, stats)),
+    ("frozen", lambda s, d, stats: dijkstra.frozen_least_cost_path(F, s, d, stats)),
+    ]
+names = [ name for (name, search) in searches ]
+
+print(("{:>10} {:>10} {:>12}" + " {:>10}" * len(names)).format(
+    "start", "dest", "cost", *names))
+
+total = { name: 0 for name in names }
+times = { name: 0.0 for name in names }
+for i in range(num_queries):
+    s = random.choice(vertex_list)
+    d = random.choice(vertex_list)
+
+    paths = {}
+    settled = {}
+    for (name, search) in searches:
+        stats = {}
+        t = time.perf_counter()
+        paths[name] = search(s, d, stats)
+        times[name] += time.perf_counter() - t
+        settled[name] = stats["settled"]
+        total[name] += stats["settled"]
+
+    d_path = paths["dijkstra"]
+    c = None
+    if d_path is not None:
+        c = digraph.pathcost(d_path, V)
+    for name in names:
+        p = paths[name]
+        if (d_path is None) != (p is None):
+            print("MISMATCH: {} -> {} reachable by only one search".format(s, d))
+            sys.exit(1)
+        if p is not None and abs(c - digraph.pathcost(p, V)) > 1e-9:
+            print("MISMATCH: {} -> {} {} cost differs".format(s, d, name))
+            sys.exit(1)
+
+    print(("{:>10} {:>10} {:>12}" + " {:>10}" * len(names)).format(
+        s, d, "-" if c is None else "{:.5f}".format(c),
+        *[ settled[name] for name in names ]))
+
+print()
+print("all {} paths agree".format(num_queries))
+for name in names:
+    print("{:>8}: {:.1f} settled per query, {:.4f}s per query".format(
+        name, total[name] / num_queries, times[name] / num_queries))
@@ -0,0 +1,320 @@
+"""
+Contraction hierarchies for fast least cost path queries.
+
+    python3 contraction.py [ ch-file [ graph-file ] ]
+
+Builds the contraction hierarchy of the road graph in graph-file
+(default edmonton-roads-digraph.txt), using digraph.cost for the edge
+costs, and saves it to ch-file (default edmonton.ch).  The route server can then load it with load_hierarchy
+instead of searching the whole road graph for every trip.
+
+Preprocessing removes ("contracts") the vertices one at a time, from
+least to most important.  When v is removed, every path u -> v -> w
+that was the only least cost way from u to w is replaced by a shortcut
+edge u -> w with the same cost.  Each vertex gets a rank, the order in
+which it was contracted.
+
+Every least cost path then has a version that only goes up in rank and
+then only goes down.  A query runs a forward search from start that
+only takes edges to higher ranked vertices, and a backward search from
+dest that does the same over reversed edges.  Both searches are tiny
+compared to a search of the whole graph.  Shortcuts in the answer are
+unpacked back into the original edges.
+"""
+
+import heapq
+import pickle
+import sys
+
+# Witness searches give up after settling this many vertices.  Giving up
+# early only adds shortcuts that were not needed, never wrong ones.
+WITNESS_SETTLE_LIMIT = 60
+
+class ContractionHierarchy:
+    """
+    The result of contracting a Digraph.
+
+    rank[v] is the order in which v was contracted.
+    up[v] is a list of (w, cost) for edges v -> w with rank[w] > rank[v].
+    down[v] is a list of (u, cost) for edges u -> v with rank[u] > rank[v].
+    middle[(u, w)] is the vertex a shortcut u -> w was made by skipping.
+
+    >>> from digraph import Digraph
+    >>> G = Digraph([(1, 2), (2, 3), (3, 4), (4, 1), (1, 3), (2, 4)])
+    >>> weights = {(1, 2): 1, (2, 3): 1, (3, 4): 1, (4, 1): 1,
+    ...            (1, 3): 5, (2, 4): 1}
+    >>> CH = build_hierarchy(G, weights.get)
+    >>> CH.least_cost_path(1, 4)
+    [1, 2, 4]
+    >>> CH.least_cost_path(3, 2)
+    [3, 4, 1, 2]
+    >>> CH.least_cost_path(2, 2)
+    [2]
+    >>> G.add_vertex(5)
+    >>> build_hierarchy(G, weights.get).least_cost_path(1, 5) is None
+    True
+    """
+
+    def __init__(self, rank, up, down, middle):
+        self.rank = rank
+        self.up = up
+        self.down = down
+        self.middle = middle
+
+    def num_shortcuts(self):
+        return len(self.middle)
+
+    def least_cost_path(self, start, dest, stats=None):
+        """
+        Returns a least cost path from start to dest as a list of
+        vertices of the original graph, or None if there is no path.
+
+        stats is filled in the same way as for
+        dijkstra.least_cost_path.
+        """
+        if start == dest:
+            if stats is not None:
+                stats["settled"] = 1
+            return [start]
+
+        # index 0 is the forward search, index 1 the backward search
+        adj = (self.up, self.down)
+        dist = ({start: 0}, {dest: 0})
+        parent = ({start: None}, {dest: None})
+        visited = (set(), set())
+        todo = ([(0, 0, start)], [(0, 0, dest)])
+        count = 1
+
+        mu = None
+        meet = None
+        while todo[0] or todo[1]:
+            # a side is finished once its frontier can not beat mu
+            for side in (0, 1):
+                if todo[side] and mu is not None and todo[side][0][0] >= mu:
+                    todo[side].clear()
+            if todo[0] and (not todo[1] or todo[0][0][0] <= todo[1][0][0]):
+                side = 0
+            elif todo[1]:
+                side = 1
+            else:
+                break
+
+            (c, i, cur) = heapq.heappop(todo[side])
+            if cur in visited[side]: continue
+            visited[side].add(cur)
+
+            other = dist[1 - side]
+            if cur in other and (mu is None or c + other[cur] < mu):
+                mu = c + other[cur]
+                meet = cur
+
+            d = dist[side]
+            for (n, w) in adj[side][cur]:
+                nc = c + w
+                if n not in d or nc < d[n]:
+                    d[n] = nc
+                    parent[side][n] = cur
+                    heapq.heappush(todo[side], (nc, count, n))
+                    count += 1
+
+        if stats is not None:
+            stats["settled"] = len(visited[0]) + len(visited[1])
+        if meet is None:
+            return None
+
+        # the path in the hierarchy, which may contain shortcuts
+        path = []
+        cur = meet
+        while cur is not None:
+            path.append(cur)
+            cur = parent[0][cur]
+        path.reverse()
+        cur = parent[1][meet]
+        while cur is not None:
+            path.append(cur)
+            cur = parent[1][cur]
+
+        return self._unpack(path)
+
+    def _unpack(self, path):
+        """
+        Replaces every shortcut edge in path with the original edges.
+        """
+        result = [path[0]]
+        for i in range(len(path) - 1):
+            todo = [(path[i], path[i+1])]
+            while todo:
+                (u, w) = todo.pop()
+                if (u, w) in self.middle:
+                    v = self.middle[(u, w)]
+                    # the first half has to come out first
+                    todo.append((v, w))
+                    todo.append((u, v))
+                else:
+                    result.append(w)
+        return result
+
+    def save(self, file_name):
+        """
+        Writes the hierarchy to file_name so it can be reloaded with
+        load_hierarchy.
+        """
+        with open(file_name, 'wb') as f:
+            pickle.dump((self.rank, self.up, self.down, self.middle), f,
+                        pickle.HIGHEST_PROTOCOL)
+
+def load_hierarchy(file_name):
+    """
+    Reads a hierarchy written by ContractionHierarchy.save.
+
+    >>> import os, tempfile
+    >>> from digraph import Digraph
+    >>> weights = {(1, 2): 2, (2, 3): 2, (1, 3): 5}
+    >>> CH = build_hierarchy(Digraph(weights), weights.get)
+    >>> (fd, name) = tempfile.mkstemp()
+    >>> os.close(fd)
+    >>> CH.save(name)
+    >>> load_hierarchy(name).least_cost_path(1, 3)
+    [1, 2, 3]
+    >>> os.remove(name)
+    """
+    with open(file_name, 'rb') as f:
+        (rank, up, down, middle) = pickle.load(f)
+    return ContractionHierarchy(rank, up, down, middle)
+
+def build_hierarchy(G, cost):
+    """
+    Contracts every vertex of the Digraph G and returns the resulting
+    ContractionHierarchy.  cost is a function that takes an edge (u, v)
+    and returns its non-negative cost.
+
+    Vertices are contracted in order of edge difference: the number of
+    shortcuts contracting it would add, minus the number of edges it
+    removes, plus how many of its neighbours are already contracted
+    (which spreads the contractions out over the graph).  Priorities
+    are only recomputed when a vertex reaches the front of the queue.
+    """
+    # the remaining (not yet contracted) graph, with the cheapest cost
+    # of each edge.  Self loops never help a least cost path.
+    out = { v: {} for v in G.vertices() }
+    inn = { v: {} for v in G.vertices() }
+    for v in out:
+        for w in G.adj_to(v):
+            if v != w:
+                out[v][w] = cost((v, w))
+                inn[w][v] = out[v][w]
+
+    rank = {}
+    up = {}
+    down = {}
+    middle = {}
+    contracted_neighbours = { v: 0 for v in out }
+
+    def priority(v):
+        shortcuts = _shortcuts(out, inn, v)
+        return (len(shortcuts) - len(out[v]) - len(inn[v])
+                + contracted_neighbours[v])
+
+    todo = [ (priority(v), i, v) for (i, v) in enumerate(out) ]
+    heapq.heapify(todo)
+
+    while todo:
+        (p, i, v) = heapq.heappop(todo)
+        # lazy update: if v got more expensive, put it back
+        p = priority(v)
+        if todo and p > todo[0][0]:
+            heapq.heappush(todo, (p, i, v))
+            continue
+
+        shortcuts = _shortcuts(out, inn, v)
+
+        rank[v] = len(rank)
+        up[v] = list(out[v].items())
+        down[v] = list(inn[v].items())
+
+        for w in out[v]:
+            del inn[w][v]
+            contracted_neighbours[w] += 1
+        for u in inn[v]:
+            del out[u][v]
+            contracted_neighbours[u] += 1
+        del out[v]
+        del inn[v]
+
+        for (u, w, c) in shortcuts:
+            if w not in out[u] or c < out[u][w]:
+                out[u][w] = c
+                inn[w][u] = c
+                middle[(u, w)] = v
+
+    return ContractionHierarchy(rank, up, down, middle)
+
+def _shortcuts(out, inn, v):
+    """
+    Returns the list of (u, w, cost) shortcuts that contracting v from
+    the remaining graph out/inn would need.
+    """
+    shortcuts = []
+    if not out[v]:
+        return shortcuts
+    max_out = max(out[v].values())
+
+    for (u, c_uv) in inn[v].items():
+        targets = { w: c_uv + c_vw for (w, c_vw) in out[v].items() if w != u }
+        if not targets: continue
+        witness = _witness_search(out, u, v, targets, c_uv + max_out)
+        for (w, c) in targets.items():
+            if witness.get(w, c + 1) > c:
+                shortcuts.append((u, w, c))
+    return shortcuts
+
+def _witness_search(out, u, skip, targets, limit):
+    """
+    Dijkstra from u in the remaining graph without vertex skip, looking
+    for paths to the targets.  Stops past cost limit, once every target
+    is settled, or after WITNESS_SETTLE_LIMIT vertices.  Returns the
+    costs found.
+    """
+    dist = {u: 0}
+    visited = set()
+    todo = [(0, 0, u)]
+    count = 1
+    remaining = len(targets)
+
+    while todo and remaining and len(visited) < WITNESS_SETTLE_LIMIT:
+        (c, i, cur) = heapq.heappop(todo)
+        if cur in visited: continue
+        if c > limit: break
+        visited.add(cur)
+        if cur in targets:
+            remaining -= 1
+
+        for (n, w) in out[cur].items():
+            if n == skip or n in visited: continue
+            nc = c + w
+            if n not in dist or nc < dist[n]:
+                dist[n] = nc
+                heapq.heappush(todo, (nc, count, n))
+                count += 1
+    return dist
+
+if __name__ == "__main__":
+    import time
+    import digraph
+
+    argv = sys.argv[1:]
+    ch_file_name = "edmonton.ch"
+    graph_file = digraph.EDMONTON_FILE
+    if argv:
+        ch_file_name = argv.pop(0)
+    if argv:
+        graph_file = argv.pop(0)
+
+    G = digraph.load_edmonton(graph_file)
+    V = digraph.vertices
+    t = time.perf_counter()
+    CH = build_hierarchy(G, lambda e: digraph.cost(e, V))
+    print("{}: contracted {} vertices, added {} shortcuts in {:.1f}s".format(
+        graph_file, len(CH.rank), CH.num_shortcuts(), time.perf_counter() - t))
+    CH.save(ch_file_name)
+    print("saved to {}".format(ch_file_name))
@@ -2,7 +2,33 @@
 Graph module for undirected graphs.
 """
 
-import random
+from array import array
+from collections import deque
+import math
+import os
+import sys
+import dijkstra
+import randgraph
+import roadgraph
+import traverse
+
+# numpy is optional, it only speeds up the bulk edge cost computations.
+# Importing it takes far longer than importing everything else here, so
+# it is only looked for when one of those computations first runs.
+_numpy_module = False
+
+def _numpy():
+    """
+    Returns the numpy module, or None if it is not installed.
+    """
+    global _numpy_module
+    if _numpy_module is False:
+        try:
+            import numpy
+        except ImportError:
+            numpy = None
+        _numpy_module = numpy
+    return _numpy_module
 
 try:
     import display
@@ -27,6 +53,10 @@ class Digraph:
     def __init__(self, edges = None):
         self._tosets = {}
         self._fromsets = {}
+        # kept in step with the adjacency sets, so num_edges is O(1)
+        self._num_edges = 0
+        # bumped on every change, so cached results can tell they are stale
+        self._version = 0
 
         if edges:
             for e in edges: self.add_edge(e)
@@ -34,6 +64,16 @@ class Digraph:
     def __repr__(self):
         return "Digraph({}, {})".format(self.vertices(), self.edges())
 
+    def __contains__(self, v):
+        """
+        True if v is a vertex of the graph, in O(1) time.
+
+        >>> G = Digraph([(1, 2)])
+        >>> (2 in G, 3 in G)
+        (True, False)
+        """
+        return v in self._tosets
+
     def add_vertex(self, v):
         """
         Adds a vertex to the graph.  It starts with no edges.
@@ -46,6 +86,7 @@ class Digraph:
         if v not in self._tosets:
             self._tosets[v] = set()
             self._fromsets[v] = set()
+            self._version += 1
 
     def add_edge(self, e):
         """
@@ -60,6 +101,8 @@ class Digraph:
         >>> G.add_edge((1, 2))
         >>> G.num_edges()
         3
+        >>> G.num_edges() == len(G.edges())
+        True
         >>> G.num_vertices()
         4
         """
@@ -68,8 +111,53 @@ class Digraph:
             self.add_vertex(v)
 
         # Add the edge
-        self._tosets[e[0]].add(e[1])
-        self._fromsets[e[1]].add(e[0])
+        if e[1] not in self._tosets[e[0]]:
+            self._tosets[e[0]].add(e[1])
+            self._fromsets[e[1]].add(e[0])
+            self._num_edges += 1
+            self._version += 1
+
+    def remove_edge(self, e):
+        """
+        Removes the edge e from the graph, leaving its vertices.  Raises
+        KeyError if there is no such edge.
+
+        >>> G = Digraph([(1, 2), (2, 3), (3, 1)])
+        >>> G.remove_edge((2, 3))
+        >>> G.num_edges()
+        2
+        >>> G.num_edges() == len(G.edges())
+        True
+        >>> (G.adj_to(2), G.adj_from(3))
+        (set(), set())
+        >>> G.remove_edge((2, 3))
+        Traceback (most recent call last):
+        ...
+        KeyError: (2, 3)
+        """
+        if e[0] not in self._tosets or e[1] not in self._tosets[e[0]]:
+            raise KeyError(tuple(e))
+        self._tosets[e[0]].remove(e[1])
+        self._fromsets[e[1]].remove(e[0])
+        self._num_edges -= 1
+        self._version += 1
+
+    def version(self):
+        """
+        Returns a number that changes whenever a vertex or edge is added,
+        or an edge removed.  Adding a vertex or edge that is already
+        there is not a change.
+
+        >>> G = Digraph([(1, 2)])
+        >>> v = G.version()
+        >>> G.add_edge((1, 2))
+        >>> G.version() == v
+        True
+        >>> G.add_edge((2, 1))
+        >>> G.version() == v
+        False
+        """
+        return self._version
 
     def edges(self):
         """
@@ -93,10 +181,14 @@ class Digraph:
         display.write_dot_desc((self.vertices(), self.eges()), filename, attr)
 
     def num_edges(self):
-        m = 0
-        for v in self._tosets:
-            m += len(self._tosets[v])
-        return m
+        """
+        Returns the number of edges in the graph, in O(1) time.
+
+        >>> G = random_graph(50, 300)
+        >>> G.num_edges() == sum(len(G.adj_to(v)) for v in G.vertices()) == 300
+        True
+        """
+        return self._num_edges
 
     def num_vertices(self):
         """
@@ -104,6 +196,17 @@ class Digraph:
         """
         return len(self._tosets)
 
+    def memory_usage(self):
+        """
+        Returns the number of bytes used by the adjacency dictionaries
+        and sets, not counting the vertices themselves.  Compare with
+        FrozenDigraph.memory_usage.
+        """
+        m = sys.getsizeof(self._tosets) + sys.getsizeof(self._fromsets)
+        for v in self._tosets:
+            m += sys.getsizeof(self._tosets[v]) + sys.getsizeof(self._fromsets[v])
+        return m
+
     def adj_to(self, v):
         """
         Returns the set of vertices that contain an edge from v.
@@ -143,18 +246,196 @@ class Digraph:
         True
         >>> G.is_path([1, 5, 4, 2])
         False
+        >>> (G.is_path([3]), G.is_path([7]), G.is_path([]))
+        (True, False, False)
+        """
+        if not path or path[0] not in self._tosets:
+            return False
+        tosets = self._tosets
+        # one pass over the consecutive pairs; a missing vertex has no
+        # edges out, and every vertex after the first ends some edge
+        return all(w in tosets.get(v, ()) for (v, w) in zip(path, path[1:]))
+
+class FrozenDigraph:
+    """
+    Read only copy of a Digraph, laid out for fast traversal and small
+    memory use.
+
+    The vertices are numbered 0 .. n-1 in the order of labels.  The
+    vertex numbers of the out-neighbours of vertex i are
+        out_targets[out_offsets[i]:out_offsets[i+1]]
+    and the in-neighbours are stored the same way in in_offsets and
+    in_targets.  These are arrays of machine integers rather than dicts
+    of sets, so each edge costs 16 bytes instead of hundreds.
+
+    adj_to, adj_from, vertices and edges take and return the original
+    vertices, like Digraph.  Algorithms that want the raw numbering can
+    use index, out_range and in_range.
+
+    >>> G = Digraph([(1, 2), (1, 3), (3, 1)])
+    >>> G.add_vertex(4)
+    >>> F = FrozenDigraph(G)
+    >>> (F.num_vertices(), F.num_edges())
+    (4, 3)
+    >>> sorted(F.adj_to(1))
+    [2, 3]
+    >>> F.adj_from(1)
+    [3]
+    >>> F.adj_to(4)
+    []
+    >>> F.vertices() == G.vertices() and F.edges() == G.edges()
+    True
+    >>> [ F.labels[j] for j in F.out_range(F.index[3]) ]
+    [1]
+    >>> F.memory_usage() < 2000
+    True
+    """
+
+    def __init__(self, G):
+        self.labels = list(G._tosets)
+        self.index = { v: i for (i, v) in enumerate(self.labels) }
+        (self.out_offsets, self.out_targets) = self._csr(G._tosets)
+        (self.in_offsets, self.in_targets) = self._csr(G._fromsets)
+        # edge costs lined up with out_targets and in_targets, once
+        # set_road_weights has computed them
+        self.out_weights = None
+        self.in_weights = None
+
+    def _csr(self, adjsets):
+        index = self.index
+        offsets = array("q", [0])
+        targets = array("q")
+        for v in self.labels:
+            targets.extend(index[w] for w in adjsets[v])
+            offsets.append(len(targets))
+        return (offsets, targets)
+
+    def __repr__(self):
+        return "FrozenDigraph({}, {})".format(self.vertices(), self.edges())
+
+    def num_vertices(self):
+        return len(self.labels)
+
+    def version(self):
+        # a FrozenDigraph never changes
+        return 0
+
+    def num_edges(self):
+        return len(self.out_targets)
+
+    def vertices(self):
+        return set(self.labels)
+
+    def edges(self):
+        labels = self.labels
+        offsets = self.out_offsets
+        targets = self.out_targets
+        return { (labels[i], labels[targets[j]])
+                 for i in range(len(labels))
+                 for j in range(offsets[i], offsets[i+1]) }
+
+    def out_range(self, i):
+        """
+        Returns the vertex numbers of the out-neighbours of vertex number i.
+        """
+        return self.out_targets[self.out_offsets[i]:self.out_offsets[i+1]]
+
+    def in_range(self, i):
+        """
+        Returns the vertex numbers of the in-neighbours of vertex number i.
         """
-        pass
+        return self.in_targets[self.in_offsets[i]:self.in_offsets[i+1]]
 
-def random_graph(n, m):
+    def adj_to(self, v):
+        """
+        Returns a list of the vertices that have an edge from v.
+        """
+        labels = self.labels
+        return [ labels[j] for j in self.out_range(self.index[v]) ]
+
+    def adj_from(self, v):
+        """
+        Returns a list of the vertices that have an edge to v.
+        """
+        labels = self.labels
+        return [ labels[j] for j in self.in_range(self.index[v]) ]
+
+    def memory_usage(self):
+        """
+        Returns the number of bytes used by the arrays, the list of
+        labels and the label to number dictionary.  The labels
+        themselves are shared with the original graph and not counted.
+        """
+        arrays = [ self.out_offsets, self.out_targets, self.in_offsets, self.in_targets ]
+        if self.out_weights is not None:
+            arrays += [ self.out_weights, self.in_weights ]
+        return (sum(sys.getsizeof(a) for a in arrays)
+                + sys.getsizeof(self.labels) + sys.getsizeof(self.index))
+
+    def set_road_weights(self, v):
+        """
+        Computes cost(edge, v) for every edge once, into the double
+        arrays out_weights and in_weights, so searches like
+        dijkstra.frozen_least_cost_path read a number instead of
+        calling cost on every relaxation.  v maps each vertex to its
+        coordinates, like vertices.
+
+        With numpy the costs come from a single pass over coordinate
+        arrays; without it, from one loop over the edges.
+
+        >>> G = Digraph([(1, 2), (2, 3), (3, 1)])
+        >>> F = FrozenDigraph(G)
+        >>> V = {1: [0, 0], 2: [0, 4], 3: [1, 4]}
+        >>> F.set_road_weights(V)
+        >>> i = F.index[1]
+        >>> (list(F.out_range(i)) == [F.index[2]], F.out_weights[F.out_offsets[i]])
+        (True, 2.0)
+        >>> sorted(F.in_weights) == sorted(F.out_weights) == [1.0, 2.0, 2.23606797749979]
+        True
+        """
+        lat = [ v[u][0] for u in self.labels ]
+        lon = [ v[u][1] for u in self.labels ]
+        self.out_weights = _road_weights(self.out_offsets, self.out_targets, lat, lon)
+        self.in_weights = _road_weights(self.in_offsets, self.in_targets, lat, lon)
+
+def _road_weights(offsets, targets, lat, lon):
+    """
+    The cost of every edge of a CSR adjacency, as a double array.  The
+    road cost formula is symmetric, so this works for in-edges too.
+    """
+    numpy = _numpy()
+    if numpy is not None:
+        lat = numpy.array(lat, dtype=float)
+        lon = numpy.array(lon, dtype=float)
+        off = numpy.frombuffer(offsets, dtype=numpy.int64)
+        tgt = numpy.frombuffer(targets, dtype=numpy.int64)
+        src = numpy.repeat(numpy.arange(len(off) - 1), numpy.diff(off))
+        w = numpy.sqrt(numpy.abs(lat[src] - lat[tgt]) + numpy.abs(lon[src] - lon[tgt]))
+        weights = array("d")
+        weights.frombytes(w.tobytes())
+        return weights
+
+    weights = array("d", bytes(8 * len(targets)))
+    sqrt = math.sqrt
+    for i in range(len(offsets) - 1):
+        (a, b) = (lat[i], lon[i])
+        for j in range(offsets[i], offsets[i+1]):
+            t = targets[j]
+            weights[j] = sqrt(abs(a - lat[t]) + abs(b - lon[t]))
+    return weights
+
+def random_graph(n, m, seed=None):
     """
-    Make a random Digraph with n vertices and m edges.
+    Make a random Digraph with n vertices and m edges, all sets of m
+    edges being equally likely.  The same seed gives the same graph.
 
     >>> G = random_graph(10, 5)
     >>> G.num_edges()
     5
     >>> G.num_vertices()
     10
+    >>> random_graph(10, 85, seed=1).edges() == random_graph(10, 85, seed=1).edges()
+    True
     >>> G = random_graph(1, 1)
     Traceback (most recent call last):
     ...
@@ -164,41 +445,39 @@ def random_graph(n, m):
     for v in range(n):
         G.add_vertex(v)
 
-    max_num_edges = n * (n-1)
-    if m > max_num_edges:
-        raise ValueError("For {} vertices, you wanted {} edges, but can only have a maximum of {}".format(n, m, max_num_edges))
-
-    while G.num_edges() < m:
-        G.add_edge(random.sample(range(n), 2))
+    for e in randgraph.gnm_edges(n, m, seed=seed):
+        G.add_edge(e)
 
     return G
 
 def spanning_tree(G, start):  
     """ 
     Runs depth-first-search on G from vertex start to create a spanning tree.
-    """
-    visited = set()
-    todo = [ (start, None) ]
 
+    >>> G = Digraph([(1, 2), (2, 3), (1, 3), (3, 4), (5, 1)])
+    >>> spanning_tree(G, 1).edges() == { (1, 2), (1, 3), (3, 4) }
+    True
+    """
     T = Digraph()
     
-    while todo:
-        (cur, e) = todo.pop()
-
-        if cur in visited: continue
-
-        visited.add(cur)
-        if e: T.add_edge(e)
-
-        for n in G.adj_to(cur):
-            if n not in visited:
-                todo.append((n, (cur, n)))
+    for (v, parent, depth) in traverse.dfs(G.adj_to, start):
+        if parent is not None: T.add_edge((parent, v))
                 
     return T
 
-def shortest_path(G, source, dest):
+def shortest_path(G, source, dest, bidirectional=False, stats=None):
     """
-    Returns the shortest path from vertex source to vertex dest.
+    Returns the shortest path from vertex source to vertex dest, the one
+    with the fewest edges, or None if dest can not be reached.
+
+    This is a breadth first search over adj_to, stopping as soon as dest
+    is found.  With bidirectional=True it also searches back from dest
+    over adj_from, and stops when the two searches meet.  On a graph
+    where the number of vertices within k edges grows quickly with k,
+    that looks at far fewer vertices.
+
+    If stats is a dict, stats["visited"] is set to the number of
+    vertices the search reached.
 
     >>> G = Digraph([(1, 2), (2, 3), (3, 4), (4, 5), (1, 6), (3, 6), (6, 7)])
     >>> path = shortest_path(G, 1, 7)
@@ -206,8 +485,94 @@ def shortest_path(G, source, dest):
     [1, 6, 7]
     >>> G.is_path(path)
     True
+    >>> shortest_path(G, 1, 7, bidirectional=True)
+    [1, 6, 7]
+    >>> shortest_path(G, 2, 7, bidirectional=True)
+    [2, 3, 6, 7]
+    >>> (shortest_path(G, 3, 3), shortest_path(G, 3, 3, bidirectional=True))
+    ([3], [3])
+    >>> (shortest_path(G, 7, 1), shortest_path(G, 7, 1, bidirectional=True))
+    (None, None)
+    >>> (shortest_path(G, 1, 99), shortest_path(G, 1, 99, bidirectional=True))
+    (None, None)
+    >>> (shortest_path(G, 99, 1), shortest_path(G, 99, 99, bidirectional=True))
+    (None, None)
     """
-    pass
+    # there is no path to or from a vertex that is not in G, whichever
+    # way the search runs
+    if source not in G or dest not in G:
+        if stats is not None:
+            stats["visited"] = 0
+        return None
+
+    if bidirectional:
+        return _bidirectional_bfs(G, source, dest, stats)
+
+    # the parent map doubles as the visited set
+    parent = { source: None }
+    todo = deque([ source ])
+    path = None
+    if source == dest:
+        path = [ source ]
+        todo.clear()
+
+    while todo:
+        cur = todo.popleft()
+        for n in G.adj_to(cur):
+            if n in parent: continue
+            parent[n] = cur
+            if n == dest:
+                path = dijkstra._build_path(parent, dest)
+                todo.clear()
+                break
+            todo.append(n)
+
+    if stats is not None:
+        stats["visited"] = len(parent)
+    return path
+
+def _bidirectional_bfs(G, source, dest, stats):
+    # parent maps of the search forward from source and back from dest
+    forward = { source: None }
+    backward = { dest: None }
+    (ftodo, btodo) = (deque([ source ]), deque([ dest ]))
+    meet = source if source == dest else None
+
+    # expand a whole level at a time, of whichever side has the smaller
+    # frontier; every meeting found within one level gives a path of the
+    # same length, so the first one is a shortest path
+    while meet is None and ftodo and btodo:
+        if len(ftodo) <= len(btodo):
+            meet = _bfs_level(ftodo, G.adj_to, forward, backward)
+        else:
+            meet = _bfs_level(btodo, G.adj_from, backward, forward)
+
+    if stats is not None:
+        stats["visited"] = len(forward) + len(backward)
+    if meet is None:
+        return None
+
+    path = dijkstra._build_path(forward, meet)
+    cur = backward[meet]
+    while cur is not None:
+        path.append(cur)
+        cur = backward[cur]
+    return path
+
+def _bfs_level(todo, adj, parent, other):
+    """
+    Expands every vertex on the current level of todo.  Returns the
+    first vertex found that the other search has reached, or None.
+    """
+    for i in range(len(todo)):
+        cur = todo.popleft()
+        for n in adj(cur):
+            if n in parent: continue
+            parent[n] = cur
+            if n in other:
+                return n
+            todo.append(n)
+    return None
 
 def compress(walk):
     """
@@ -233,27 +598,21 @@ def compress(walk):
     return rv
     
 def least_cost_path(G, start, dest, cost, V):
-    todo = {start: 0}
-    parent = {}
-    visited = set()
-    while todo and dest not in visited:
-        cur = min(todo, key=todo.get)
-        c = todo[cur]
-        todo.pop(cur)
-        visited.add(cur)
-        for n in G.adj_to(cur):
-            if n in visited: continue
-            if n not in todo or ( c + cost((cur,n), V) < todo[n] ):
-                todo[n] = c + cost((cur,n), V)
-                parent[n] = cur
-    if dest in visited:
-        path = []
-        while start not in path:
-            path.insert(0, parent[cur])
-            cur = parent[cur]
-        return path
-    else:
-        return None            
+    """
+    Returns a least cost path from start to dest, where cost(edge, V)
+    gives the cost of an edge from the vertex coordinates V.  Returns
+    None if there is no path.
+
+    The search itself is done by dijkstra.least_cost_path.
+
+    >>> G = Digraph([(1, 2), (2, 3), (1, 3)])
+    >>> V = {1: [0, 0], 2: [0, 1], 3: [0, 2]}
+    >>> least_cost_path(G, 1, 3, cost, V)
+    [1, 3]
+    >>> least_cost_path(G, 3, 1, cost, V) is None
+    True
+    """
+    return dijkstra.least_cost_path(G, start, dest, lambda e: cost(e, V))
 
 def cost(edge, v):
     cost = (abs(v[edge[0]][0]-v[edge[1]][0]) + abs(v[edge[0]][1]-v[edge[1]][1]))**0.5
@@ -265,25 +624,67 @@ def pathcost(path, v):
         pathcost += cost((path[i], path[i+1]), v)
     return pathcost
 
-infile = open("edmonton-roads-digraph.txt", "r")
+def pathcost_vectorized(path, v):
+    """
+    Same as pathcost, but computes all the edge costs of the path in one
+    go, with numpy if it is available.  Worth it for long paths.
+
+    >>> V = {1: [0, 0], 2: [0, 4], 3: [1, 4]}
+    >>> pathcost_vectorized([1, 2, 3], V) == pathcost([1, 2, 3], V)
+    True
+    >>> pathcost_vectorized([1], V)
+    0
+    """
+    if len(path) < 2:
+        return 0
+    numpy = _numpy()
+    if numpy is not None:
+        c = numpy.array([ v[u] for u in path ], dtype=float)
+        d = numpy.abs(numpy.diff(c, axis=0))
+        return float(numpy.sqrt(d.sum(axis=1)).sum())
+    coords = [ v[u] for u in path ]
+    sqrt = math.sqrt
+    return sum(sqrt(abs(p[0] - q[0]) + abs(p[1] - q[1]))
+               for (p, q) in zip(coords, coords[1:]))
+
+EDMONTON_FILE = "edmonton-roads-digraph.txt"
+
+# vertex -> [lat, lon] for the Edmonton graph, filled in by load_edmonton
 vertices = {}
-edges = []
-for line in infile:
-    line = line.rstrip()
-    fields = line.split(",")
-    
-    type = fields.pop(0)
-
-    if type == "E":
-        (start, stop, name) = fields
-        name = name.strip('"')
-        stop = int(stop)
-        start = int(start)
-        edges.append([start, stop])
-    if type == "V":
-        (name, lon, lat) = fields
-        vertices[int(name)] = [float(lon),float(lat)]
-edmonton = Digraph(edges)
+_edmonton = None
+# the file _edmonton was read from, as an absolute path
+_edmonton_path = None
+
+def load_edmonton(path=None):
+    """
+    Returns the Edmonton road Digraph, reading it from path (default
+    EDMONTON_FILE) the first time it is asked for.  Later calls return
+    the same graph.  The coordinates of its vertices are put in the
+    module level dictionary vertices.
+
+    There is only one vertices dictionary, so only one road graph can be
+    loaded.  Asking for a different file after that raises ValueError.
+
+    Importing this module does not read the file, so code that only
+    wants the Digraph class does not pay for parsing the road network.
+    """
+    global _edmonton, _edmonton_path
+    if path is None:
+        path = EDMONTON_FILE
+    path = os.path.abspath(path)
+    if _edmonton is not None and path != _edmonton_path:
+        raise ValueError("road graph already loaded from {}, can not also load {}".format(
+            _edmonton_path, path))
+    if _edmonton is None:
+        road = roadgraph.load_road_graph(path)
+        G = Digraph(road.edges())
+        coords = road.coordinates()
+        for v in coords:
+            G.add_vertex(v)
+        vertices.update(coords)
+        _edmonton = G
+        _edmonton_path = path
+    return _edmonton
 
 if __name__ == "__main__":
     import doctest
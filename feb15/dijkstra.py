@@ -1,22 +1,410 @@
-def least_cost_path(G, start, dest, cost):
-    todo = {start: 0}
-    parent = {}
+"""
+Least cost path search over a Digraph.
+
+This is the one shared shortest path engine.  It only relies on the
+graph having an adj_to(v) method, so it works on anything with the
+Digraph read interface.
+
+cost is a function that takes an edge (u, v) and returns the
+non-negative cost of travelling along it.
+"""
+
+import heapq
+
+def least_cost_path(G, start, dest, cost, stats=None):
+    """
+    Returns a least cost path from start to dest in G as a list of
+    vertices [start, ..., dest], or None if dest can not be reached.
+
+    The frontier is kept in a binary heap.  When a vertex gets a cheaper
+    tentative cost a new heap entry is pushed and the stale one is
+    skipped when it is popped, so the search is O((n + m) log n).  The
+    search stops as soon as dest is settled.
+
+    If stats is a dict, stats["settled"] is set to the number of
+    vertices whose final cost was fixed by the search.
+
+    >>> from digraph import Digraph
+    >>> G = Digraph([(1, 2), (2, 3), (1, 3), (3, 4), (4, 1)])
+    >>> weights = {(1, 2): 1, (2, 3): 1, (1, 3): 5, (3, 4): 1, (4, 1): 1}
+    >>> least_cost_path(G, 1, 3, weights.get)
+    [1, 2, 3]
+    >>> least_cost_path(G, 1, 1, weights.get)
+    [1]
+    >>> least_cost_path(G, 4, 3, weights.get)
+    [4, 1, 2, 3]
+    >>> G.add_vertex(5)
+    >>> least_cost_path(G, 1, 5, weights.get) is None
+    True
+    """
+    dist = {start: 0}
+    parent = {start: None}
     visited = set()
-    while todo and dest not in visited:
-        (cur,c) = min(todo, key=todo.get)
-        todo.pop(cur)
+    todo = [(0, 0, start)]
+    # tie breaker so vertices are never compared with each other
+    count = 1
+
+    path = None
+    while todo:
+        (c, i, cur) = heapq.heappop(todo)
+        if cur in visited: continue
         visited.add(cur)
+
+        if cur == dest:
+            path = _build_path(parent, dest)
+            break
+
         for n in G.adj_to(cur):
             if n in visited: continue
-            if n not in todo or ( c + cost((cur,n)) < todo[n] ):
-                todo[n] = c + cost((cur,n))
+            nc = c + cost((cur, n))
+            if n not in dist or nc < dist[n]:
+                dist[n] = nc
+                parent[n] = cur
+                heapq.heappush(todo, (nc, count, n))
+                count += 1
+
+    if stats is not None:
+        stats["settled"] = len(visited)
+    return path
+
+class ShortestPathTree:
+    """
+    The least cost paths from one source vertex, as found by
+    shortest_path_tree.
+
+    parent[v] is the vertex before v on the least cost path to v, and
+    parent[source] is None.  dist[v] is the cost of that path.  Only
+    vertices that were reached (and settled) appear in them.
+    """
+
+    def __init__(self, source, parent, dist):
+        self.source = source
+        self.parent = parent
+        self.dist = dist
+
+    def __contains__(self, v):
+        return v in self.parent
+
+    def path_to(self, dest):
+        """
+        Returns the least cost path from the source to dest, or None if
+        dest was not reached.  O(length of the path).
+        """
+        if dest not in self.parent:
+            return None
+        return _build_path(self.parent, dest)
+
+    def cost_to(self, dest):
+        """
+        Returns the cost of the least cost path to dest, or None.
+        """
+        return self.dist.get(dest)
+
+def shortest_path_tree(G, source, cost, targets=None):
+    """
+    Runs Dijkstra from source and returns the ShortestPathTree of least
+    cost paths to every vertex it can reach.  Any number of paths can
+    then be read off the tree without searching again.
+
+    If targets is given, the search stops as soon as all of the targets
+    are settled, so the tree may leave out vertices that are further
+    away than every target.
+
+    >>> from digraph import Digraph
+    >>> G = Digraph([(1, 2), (2, 3), (1, 3), (3, 4), (5, 1)])
+    >>> weights = {(1, 2): 1, (2, 3): 1, (1, 3): 5, (3, 4): 1, (5, 1): 1}
+    >>> T = shortest_path_tree(G, 1, weights.get)
+    >>> [ T.path_to(v) for v in (1, 3, 4) ]
+    [[1], [1, 2, 3], [1, 2, 3, 4]]
+    >>> T.cost_to(4)
+    3
+    >>> T.path_to(5) is None and 5 not in T
+    True
+    >>> T = shortest_path_tree(G, 1, weights.get, targets=[2])
+    >>> 4 in T
+    False
+    """
+    if targets is not None:
+        remaining = set(targets)
+        remaining.discard(source)
+    dist = {source: 0}
+    parent = {source: None}
+    final = {}
+    todo = [(0, 0, source)]
+    count = 1
+
+    while todo:
+        (c, i, cur) = heapq.heappop(todo)
+        if cur in final: continue
+        final[cur] = c
+
+        if targets is not None:
+            remaining.discard(cur)
+            if not remaining:
+                break
+
+        for n in G.adj_to(cur):
+            if n in final: continue
+            nc = c + cost((cur, n))
+            if n not in dist or nc < dist[n]:
+                dist[n] = nc
                 parent[n] = cur
-    if dest in visited:
-        path = []
-        while start not in path:
-            path.insert(0, parent[cur])
-            cur = parent[cur]
-        return path
-    else:
+                heapq.heappush(todo, (nc, count, n))
+                count += 1
+
+    # drop the vertices that were reached but not settled
+    parent = { v: parent[v] for v in final }
+    return ShortestPathTree(source, parent, final)
+
+def frozen_least_cost_path(F, start, dest, stats=None):
+    """
+    least_cost_path for a FrozenDigraph whose edge costs have been
+    precomputed with set_road_weights (or filled into out_weights some
+    other way).  The search runs on vertex numbers and reads each edge
+    cost from the weight array, with no call per edge.
+
+    >>> from digraph import Digraph, FrozenDigraph
+    >>> F = FrozenDigraph(Digraph([(1, 2), (2, 3), (1, 3), (3, 4)]))
+    >>> F.set_road_weights({1: (0, 0), 2: (0, 1), 3: (1, 1), 4: (9, 9)})
+    >>> frozen_least_cost_path(F, 1, 4)
+    [1, 3, 4]
+    >>> frozen_least_cost_path(F, 4, 1) is None
+    True
+    """
+    offsets = F.out_offsets
+    targets = F.out_targets
+    weights = F.out_weights
+    s = F.index[start]
+    t = F.index[dest]
+
+    dist = {s: 0.0}
+    parent = {s: None}
+    visited = set()
+    todo = [(0.0, s)]
+
+    path = None
+    while todo:
+        (c, cur) = heapq.heappop(todo)
+        if cur in visited: continue
+        visited.add(cur)
+
+        if cur == t:
+            labels = F.labels
+            path = [ labels[i] for i in _build_path(parent, t) ]
+            break
+
+        for j in range(offsets[cur], offsets[cur+1]):
+            n = targets[j]
+            if n in visited: continue
+            nc = c + weights[j]
+            if n not in dist or nc < dist[n]:
+                dist[n] = nc
+                parent[n] = cur
+                heapq.heappush(todo, (nc, n))
+
+    if stats is not None:
+        stats["settled"] = len(visited)
+    return path
+
+def road_distance(p, q):
+    """
+    The cost of going between coordinates p and q, the same formula as
+    digraph.cost uses for an edge:
+        sqrt(|p_lat - q_lat| + |p_lon - q_lon|)
+
+    Since sqrt(a + b) <= sqrt(a) + sqrt(b), the road_distance between
+    two vertices is never more than the cost of any path between them.
+
+    >>> road_distance((0, 0), (3, 1))
+    2.0
+    """
+    return (abs(p[0] - q[0]) + abs(p[1] - q[1]))**0.5
+
+def a_star_path(G, start, dest, coords, stats=None):
+    """
+    Returns a least cost path from start to dest in G, or None if there
+    is none.  coords maps each vertex to its (lat, lon) and the cost of
+    an edge is the road_distance between its endpoints, as in
+    digraph.cost.
+
+    The search is Dijkstra with the frontier ordered by cost so far plus
+    the road_distance to dest.  That estimate never overestimates and
+    obeys the triangle inequality, so the first time dest is settled
+    its path is a least cost one.  Vertices far off the line from start
+    to dest are usually never settled.
+
+    stats is filled in the same way as for least_cost_path.
+
+    >>> from digraph import Digraph
+    >>> coords = { (x, y): (x, y) for x in range(6) for y in range(6) }
+    >>> G = Digraph()
+    >>> for (x, y) in coords:
+    ...     for (a, b) in [ (x+1, y), (x, y+1), (x-1, y), (x, y-1) ]:
+    ...         if (a, b) in coords: G.add_edge(((x, y), (a, b)))
+    >>> cost = lambda e: road_distance(coords[e[0]], coords[e[1]])
+    >>> a_stats = {}
+    >>> d_stats = {}
+    >>> path = a_star_path(G, (0, 0), (5, 0), coords, a_stats)
+    >>> path
+    [(0, 0), (1, 0), (2, 0), (3, 0), (4, 0), (5, 0)]
+    >>> path == least_cost_path(G, (0, 0), (5, 0), cost, d_stats)
+    True
+    >>> a_stats["settled"] < d_stats["settled"]
+    True
+    >>> G.add_vertex("island")
+    >>> coords["island"] = (9, 9)
+    >>> a_star_path(G, (0, 0), "island", coords) is None
+    True
+    """
+    target = coords[dest]
+    dist = {start: 0}
+    parent = {start: None}
+    visited = set()
+    todo = [(road_distance(coords[start], target), 0, start)]
+    count = 1
+
+    path = None
+    while todo:
+        (f, i, cur) = heapq.heappop(todo)
+        if cur in visited: continue
+        visited.add(cur)
+
+        if cur == dest:
+            path = _build_path(parent, dest)
+            break
+
+        c = dist[cur]
+        cur_coord = coords[cur]
+        for n in G.adj_to(cur):
+            if n in visited: continue
+            n_coord = coords[n]
+            nc = c + road_distance(cur_coord, n_coord)
+            if n not in dist or nc < dist[n]:
+                dist[n] = nc
+                parent[n] = cur
+                heapq.heappush(todo, (nc + road_distance(n_coord, target), count, n))
+                count += 1
+
+    if stats is not None:
+        stats["settled"] = len(visited)
+    return path
+
+def bidirectional_least_cost_path(G, start, dest, cost, stats=None):
+    """
+    Returns a least cost path from start to dest in G, or None if there
+    is none.  Gives the same cost as least_cost_path, but runs a forward
+    search from start over G.adj_to and a backward search from dest over
+    G.adj_from at the same time, always advancing the side with the
+    cheaper frontier.
+
+    mu is the cost of the best start to dest path seen so far, through
+    some vertex reached by both searches.  Once the two smallest
+    frontier costs add up to at least mu no cheaper path can exist, so
+    the search stops.  On long queries the two searches each cover a
+    disc of about half the radius, settling roughly half as many
+    vertices as a one sided search.
+
+    stats is filled in the same way as for least_cost_path, counting the
+    vertices settled by both sides.
+
+    >>> from digraph import Digraph
+    >>> G = Digraph([(1, 2), (2, 3), (3, 4), (4, 5), (1, 6), (6, 5), (5, 1)])
+    >>> weights = {(1, 2): 1, (2, 3): 1, (3, 4): 1, (4, 5): 1,
+    ...            (1, 6): 3, (6, 5): 3, (5, 1): 1}
+    >>> bidirectional_least_cost_path(G, 1, 5, weights.get)
+    [1, 2, 3, 4, 5]
+    >>> weights[(3, 4)] = 5
+    >>> bidirectional_least_cost_path(G, 1, 5, weights.get)
+    [1, 6, 5]
+    >>> bidirectional_least_cost_path(G, 5, 4, weights.get)
+    [5, 1, 2, 3, 4]
+    >>> bidirectional_least_cost_path(G, 3, 3, weights.get)
+    [3]
+    >>> G.add_vertex(7)
+    >>> bidirectional_least_cost_path(G, 1, 7, weights.get) is None
+    True
+    >>> bidirectional_least_cost_path(G, 1, 99, weights.get) is None
+    True
+    """
+    # as with least_cost_path, a dest that is not in G is unreachable;
+    # the backward search could not even start from it
+    if dest not in G:
+        if stats is not None:
+            stats["settled"] = 0
+        return None
+
+    if start == dest:
+        if stats is not None:
+            stats["settled"] = 1
+        return [start]
+
+    # index 0 is the forward search, index 1 the backward search
+    dist = ({start: 0}, {dest: 0})
+    parent = ({start: None}, {dest: None})
+    visited = (set(), set())
+    todo = ([(0, 0, start)], [(0, 0, dest)])
+    count = 1
+
+    mu = None
+    meet = None
+    while todo[0] and todo[1]:
+        if mu is not None and todo[0][0][0] + todo[1][0][0] >= mu:
+            break
+
+        side = 0 if todo[0][0][0] <= todo[1][0][0] else 1
+        (c, i, cur) = heapq.heappop(todo[side])
+        if cur in visited[side]: continue
+        visited[side].add(cur)
+
+        if side == 0:
+            neighbours = G.adj_to(cur)
+        else:
+            neighbours = G.adj_from(cur)
+        d = dist[side]
+        other = dist[1 - side]
+        for n in neighbours:
+            if n in visited[side]: continue
+            if side == 0:
+                nc = c + cost((cur, n))
+            else:
+                nc = c + cost((n, cur))
+            if n not in d or nc < d[n]:
+                d[n] = nc
+                parent[side][n] = cur
+                heapq.heappush(todo[side], (nc, count, n))
+                count += 1
+            if n in other and (mu is None or d[n] + other[n] < mu):
+                mu = d[n] + other[n]
+                meet = n
+
+    if stats is not None:
+        stats["settled"] = len(visited[0]) + len(visited[1])
+    if meet is None:
         return None
 
+    path = _build_path(parent[0], meet)
+    cur = parent[1][meet]
+    while cur is not None:
+        path.append(cur)
+        cur = parent[1][cur]
+    return path
+
+def _build_path(parent, dest):
+    """
+    Follows parent pointers back from dest and returns the path
+    in forward order.  Linear in the length of the path.
+
+    >>> _build_path({1: None, 2: 1, 3: 2}, 3)
+    [1, 2, 3]
+    """
+    path = []
+    cur = dest
+    while cur is not None:
+        path.append(cur)
+        cur = parent[cur]
+    path.reverse()
+    return path
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
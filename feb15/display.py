@@ -37,17 +37,30 @@ Each of these keys maps to a dictionary.
         not present, the dge is unlabelled. 
     
 """
+from itertools import islice
 import time
 import sys
 
-def gen_dot_desc(G, graphtype='graph', attributes={}):
+def dot_lines(G, graphtype='graph', attributes={}):
     """
-    Given graph G, return a string that encodes the dot
-    representation of G.
+    Generates the dot representation of G a line at a time: the
+    header, one line per vertex, one line per edge, and the closing
+    brace.  Nothing is built up in memory, so a graph of any size can
+    be streamed straight into a file.
 
     >>> g = ({1, 2, 3}, {(1, 2), (1, 3)} )
-    >>> s = gen_dot_desc(g)
- 
+    >>> for line in dot_lines(g, 'digraph', {"edge_label": {(1, 3): 7}}):
+    ...     print(line, end="")
+    digraph g {
+      ordering=out;
+      node [shape=circle];
+      edge [penwidth=3];
+      1 [label="1", style=filled, fillcolor="white"];
+      2 [label="2", style=filled, fillcolor="white"];
+      3 [label="3", style=filled, fillcolor="white"];
+      1 -> 2 [color="black" ];
+      1 -> 3 [color="black" , label="7"];
+    }
     """
     if "vertex_color" in attributes:
         vertex_color=attributes["vertex_color"]
@@ -77,7 +90,7 @@ def gen_dot_desc(G, graphtype='graph', attributes={}):
         edgesym = "->"
 
     # generate the header
-    dot_desc = ( graphtype + 
+    yield ( graphtype + 
         " g {\n" + 
         "  ordering=out;\n" +
         "  node [shape=circle];\n" +
@@ -86,7 +99,7 @@ def gen_dot_desc(G, graphtype='graph', attributes={}):
 
     # now generate vertex and edges information
     if len(V) == 0:
-       dot_desc += "Empty [shape=ellipse];\n"
+       yield "Empty [shape=ellipse];\n"
     else:
         for n in V:
             color = "white"
@@ -97,7 +110,7 @@ def gen_dot_desc(G, graphtype='graph', attributes={}):
             if n in vertex_label: 
                 label = vertex_label[n]
 
-            dot_desc += '  {v} [label="{l}", style=filled, fillcolor="{c}"];\n'.format(
+            yield '  {v} [label="{l}", style=filled, fillcolor="{c}"];\n'.format(
                 v=str(n), l=label, c=color)
 
         for e in E:
@@ -109,14 +122,25 @@ def gen_dot_desc(G, graphtype='graph', attributes={}):
             if e in edge_label:
                 label = ', label="{}"'.format(edge_label[e])
 
-            dot_desc += '  {vx} {esym} {vy} [color="{c}" {l}];\n'.format(
+            yield '  {vx} {esym} {vy} [color="{c}" {l}];\n'.format(
                     esym=edgesym, vx=str(x), vy=str(y), c=color, l=label)
 
 
     # close off the description
-    dot_desc += "}\n"
+    yield "}\n"
+
+def gen_dot_desc(G, graphtype='graph', attributes={}):
+    """
+    Given graph G, return a string that encodes the dot
+    representation of G.  To write it to a file, write_dot_desc
+    is better, as it never holds the whole string.
 
-    return dot_desc
+    >>> g = ({1, 2, 3}, {(1, 2), (1, 3)} )
+    >>> s = gen_dot_desc(g)
+    >>> s == "".join(dot_lines(g))
+    True
+    """
+    return "".join(dot_lines(G, graphtype, attributes))
 
 def write_dot_desc(G, file_name, graphtype='graph', attributes={}):
     """
@@ -129,9 +153,18 @@ def write_dot_desc(G, file_name, graphtype='graph', attributes={}):
     # instead of f = open(file_name, 'w') inside a try block, use
     # the safe open that closes file on an exception, from
     # http://docs.python.org/3.2/tutorial/inputoutput.html
+    #
+    # The lines are written out a few thousand at a time as they are
+    # generated, rather than joined into one big string first.
+    # Joining each batch makes for far fewer calls on the file than
+    # writing the lines one by one.
 
     with open(file_name, 'w') as f:
-        f.write( gen_dot_desc(G, graphtype, attributes) )
+        lines = dot_lines(G, graphtype, attributes)
+        batch = list(islice(lines, 4096))
+        while batch:
+            f.write( "".join(batch) )
+            batch = list(islice(lines, 4096))
 
 def pause(time=1,prompt="next?"):
     """
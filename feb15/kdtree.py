@@ -0,0 +1,116 @@
+"""
+A 2-d tree for finding the vertex closest to a point, for turning the
+raw (lat, lon) of a trip request into a vertex of the road graph.
+
+The tree is built once from a dictionary like digraph.vertices that
+maps each vertex to its coordinates.  Distance is ordinary straight
+line distance in (lat, lon).
+
+The points are kept in one list laid out as an implicit balanced tree:
+the point at the middle of any range splits the rest of the range into
+the points below it and the points above it, alternating between
+comparing lat (even depths) and lon (odd depths).  There are no node
+objects, so the tree costs one tuple per vertex.
+
+>>> coords = { "a": (0, 0), "b": (10, 0), "c": (0, 10), "d": (7, 7), "e": (3, 1) }
+>>> T = KDTree(coords)
+>>> T.nearest((9, 1))
+'b'
+>>> T.k_nearest((2, 1), 3)
+['e', 'a', 'd']
+>>> T.nearest_many([(0, 9), (6, 6)])
+['c', 'd']
+"""
+
+import heapq
+
+class KDTree:
+    def __init__(self, coords):
+        self._points = [ (p[0], p[1], v) for (v, p) in coords.items() ]
+        self._build(0, len(self._points), 0)
+
+    def __len__(self):
+        return len(self._points)
+
+    def _build(self, lo, hi, axis):
+        # sorting each range gives O(n log^2 n) for the whole build,
+        # fine for a tree that is built once
+        todo = [ (lo, hi, axis) ]
+        points = self._points
+        while todo:
+            (lo, hi, axis) = todo.pop()
+            if hi - lo <= 1: continue
+            points[lo:hi] = sorted(points[lo:hi], key=lambda p: p[axis])
+            mid = (lo + hi) // 2
+            todo.append((lo, mid, 1 - axis))
+            todo.append((mid + 1, hi, 1 - axis))
+
+    def nearest(self, point):
+        """
+        Returns the vertex closest to point, or None if the tree is
+        empty.
+        """
+        best = self.k_nearest(point, 1)
+        if best:
+            return best[0]
+        return None
+
+    def k_nearest(self, point, k):
+        """
+        Returns a list of the k vertices closest to point, closest first.
+        Takes O(log n) time for small k on well spread out points.
+
+        >>> KDTree({ "a": (0, 0) }).k_nearest((1, 1), 0)
+        []
+        """
+        if k <= 0:
+            return []
+        points = self._points
+        (x, y) = (point[0], point[1])
+        # max-heap (by negated distance) of the best k found so far
+        best = []
+        # ranges still to search, with the squared distance from point
+        # to the line that separates the range from point's side
+        todo = [ (0, len(points), 0, 0) ]
+        while todo:
+            (lo, hi, axis, bound) = todo.pop()
+            if lo >= hi: continue
+            # nothing in this range can beat the worst of the best k
+            if len(best) == k and bound >= -best[0][0]: continue
+
+            mid = (lo + hi) // 2
+            p = points[mid]
+            d = (p[0] - x)**2 + (p[1] - y)**2
+            if len(best) < k:
+                heapq.heappush(best, (-d, mid))
+            elif d < -best[0][0]:
+                heapq.heapreplace(best, (-d, mid))
+
+            diff = (x if axis == 0 else y) - p[axis]
+            if diff < 0:
+                (near, far) = ((lo, mid), (mid + 1, hi))
+            else:
+                (near, far) = ((mid + 1, hi), (lo, mid))
+            # the near side goes on top so it is searched first
+            todo.append((far[0], far[1], 1 - axis, max(bound, diff * diff)))
+            todo.append((near[0], near[1], 1 - axis, bound))
+
+        best.sort(reverse=True)
+        return [ points[i][2] for (d, i) in best ]
+
+    def nearest_many(self, points):
+        """
+        Returns the list of nearest vertices for a list of points.
+        """
+        # searching in sorted order keeps the same parts of the tree in
+        # the cpu cache from one query to the next
+        order = sorted(range(len(points)), key=lambda i: points[i])
+        result = [ None ] * len(points)
+        nearest = self.nearest
+        for i in order:
+            result[i] = nearest(points[i])
+        return result
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
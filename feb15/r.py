@@ -1,17 +1,5 @@
-infile = open("edmonton-roads-digraph.txt", "r")
-for line in infile:
-    line = line.rstrip()
-    fields = line.split(",")
+import roadgraph
 
-    type = fields.pop(0)
-
-    if type == "E":
-        # print(fields)
-
-        (start, stop, name) = fields
-
-        name = name.strip('"')
-
-        print("{}->{}:{}".format(int(start), int(stop), name))
-
-    #print("<" + line + ">")
+road = roadgraph.load_road_graph("edmonton-roads-digraph.txt")
+for (start, stop, name) in road.street_names():
+    print("{}->{}:{}".format(start, stop, name))
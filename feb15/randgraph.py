@@ -0,0 +1,139 @@
+"""
+Fast random graph generation.
+
+The vertices are 0 .. n-1.  The possible edges are numbered 0 .. N-1,
+where N is n(n-1) for a directed graph and n(n-1)/2 for an undirected
+one, and a random graph is a random set of those numbers decoded back
+into edges.  Nothing ever asks a graph how many edges it has, so
+generation takes O(n + m) time for m edges.
+
+gnm_edges(n, m)    exactly m distinct edges, all sets of m equally likely
+gnp_edges(n, p)    each possible edge present with probability p
+
+Both take directed=True or False (undirected edges come out as (u, v)
+with u < v) and a seed for reproducible graphs.  When most of the
+possible edges are wanted, the edges to leave out are chosen instead,
+and the rest listed.
+
+feb8/Digraph and Quiz4 have their own cut down copies, with only the
+directed and only the undirected G(n, m) generator respectively.
+
+>>> e = gnm_edges(10, 30, seed=1)
+>>> len(e) == len(set(e)) == 30
+True
+>>> all(0 <= u < 10 and 0 <= v < 10 and u != v for (u, v) in e)
+True
+>>> e == gnm_edges(10, 30, seed=1)
+True
+>>> sorted(gnm_edges(3, 3, directed=False))
+[(0, 1), (0, 2), (1, 2)]
+>>> len(gnm_edges(100, 9800, seed=2)) == len(set(gnm_edges(100, 9800, seed=2))) == 9800
+True
+>>> gnm_edges(3, 7)
+Traceback (most recent call last):
+...
+ValueError: For 3 vertices, you wanted 7 edges, but can only have a maximum of 6
+>>> gnp_edges(5, 0)
+[]
+>>> len(gnp_edges(5, 1, directed=False))
+10
+>>> all(u < v for (u, v) in gnp_edges(50, 0.3, directed=False, seed=3))
+True
+"""
+
+import math
+import random
+
+def max_edges(n, directed=True):
+    """
+    The number of possible edges (without self loops) on n vertices.
+
+    >>> (max_edges(4), max_edges(4, directed=False))
+    (12, 6)
+    """
+    if directed:
+        return n * (n - 1)
+    return n * (n - 1) // 2
+
+def edge_number(i, n, directed=True):
+    """
+    Returns edge number i of the possible edges on n vertices.
+
+    Directed edge i starts at u = i // (n-1); the remainder picks v
+    among the other n-1 vertices.  Undirected edges (u, v) with u < v
+    are numbered v(v-1)/2 + u.
+
+    >>> [ edge_number(i, 3) for i in range(6) ]
+    [(0, 1), (0, 2), (1, 0), (1, 2), (2, 0), (2, 1)]
+    >>> [ edge_number(i, 3, directed=False) for i in range(3) ]
+    [(0, 1), (0, 2), (1, 2)]
+    """
+    if directed:
+        (u, r) = divmod(i, n - 1)
+        if r >= u:
+            r += 1
+        return (u, r)
+    v = (1 + math.isqrt(1 + 8 * i)) // 2
+    return (i - v * (v - 1) // 2, v)
+
+def gnm_edges(n, m, directed=True, seed=None):
+    """
+    Returns a list of m distinct random edges on the vertices 0 .. n-1.
+    """
+    N = max_edges(n, directed)
+    if m > N:
+        raise ValueError("For {} vertices, you wanted {} edges, but can only have a maximum of {}".format(n, m, N))
+    rng = random.Random(seed)
+
+    if m <= N // 2:
+        # random.sample of a range only remembers what it picked,
+        # O(m) time and space however big N is
+        numbers = rng.sample(range(N), m)
+    else:
+        # dense graph: pick the N - m edges to leave out
+        left_out = set(rng.sample(range(N), N - m))
+        numbers = [ i for i in range(N) if i not in left_out ]
+
+    return [ edge_number(i, n, directed) for i in numbers ]
+
+def gnp_edges(n, p, directed=True, seed=None):
+    """
+    Returns a list of random edges on the vertices 0 .. n-1, where each
+    possible edge is present independently with probability p.
+
+    Rather than flipping a coin for every one of the N possible edges,
+    the gap to the next present edge is drawn directly from its
+    geometric distribution (skip sampling), so the time is O(n + m).
+    For p > 1/2 the missing edges are skip sampled instead.
+    """
+    N = max_edges(n, directed)
+    rng = random.Random(seed)
+
+    if p <= 0:
+        return []
+    if p >= 1:
+        return [ edge_number(i, n, directed) for i in range(N) ]
+
+    if p <= 0.5:
+        return [ edge_number(i, n, directed) for i in _skip_sample(N, p, rng) ]
+
+    left_out = set(_skip_sample(N, 1 - p, rng))
+    return [ edge_number(i, n, directed) for i in range(N) if i not in left_out ]
+
+def _skip_sample(N, p, rng):
+    """
+    Generates the numbers in 0 .. N-1 that each came up with
+    probability p, in increasing order.
+    """
+    log_q = math.log(1 - p)
+    i = -1
+    while True:
+        # the number of misses before the next hit is geometric
+        i += 1 + int(math.log(1 - rng.random()) / log_q)
+        if i >= N:
+            return
+        yield i
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
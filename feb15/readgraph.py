@@ -6,76 +6,145 @@ and edges of a street digraph and converts it into a digraph instance.
 
 If the optional argument digraph-file is supplied, reads that, otherwise
 takes input from stdin
+
+The file is read one line at a time.  parse_records generates the
+records as they are read, and read_digraph adds them to a Digraph as
+they arrive, so only the graph itself is kept in memory and road
+networks much bigger than Edmonton can be read.
+
+>>> import io
+>>> f = io.StringIO('V,1,53.5,-113.5\\nV,2,53.6,-113.4\\nE,1,2,"Main St"\\n')
+>>> for r in parse_records(f): print(r)
+Vertex(id=1, lat=53.5, lon=-113.5)
+Vertex(id=2, lat=53.6, lon=-113.4)
+Edge(start=1, stop=2, name='Main St')
 """
+import collections
 import sys
 
-# throw away executable name before processing command line arguments
-argv = sys.argv[1:]
-
-# if filename is supplied, use that, otherwise use stdin
-if argv:
-    digraph_file_name = argv.pop(0)
-    digraph_file = open(digraph_file_name, 'r')
-else:
-    digraph_file = sys.stdin
-
-# For testing, just use a simple representation of set of vertices, set of
-# edges as ordered pairs, and dctionaries that map
-#   vertex to (lat,long)
-#   edge to street name
-
-V = set()
-E = set()
-V_coord = { }
-E_name = { }
-
-# process each line in the file
-for line in digraph_file:
-
-    # strip all trailing whitespace
-    line = line.rstrip()
-
-    fields = line.split(",")
-    type = fields[0]
-
-    if type == 'V':
-        # got a vertex record
-        (id,lat,long) = fields[1:]
-
-        # vertex id's should be ints
-        id=int(id)
-
-        # lat and long are floats
-        lat=float(lat)
-        long=float(long)
-
-        V.add(id)
-        V_coord[id] = (lat,long)
-        
-    elif type == 'E':
-        # got an edge record
-        (start,stop,name) = fields[1:]
-
-        # vertices are ints
-        start=int(start)
-        stop=int(stop)
-        e = (start,stop)
-
-        # get rid of leading and trailing quote " chars around name
-        name = name.strip('"')
-
-        # consistency check, we don't want auto adding of vertices when
-        # adding an edge.
-        if start not in V or stop not in V:
-            raise Exception("Edge {} has an endpoint that is not a vertex".format(e) )
-
-        E.add(e)
-        E_name[e] = name
+# digraph imports roadgraph, which reads its files with parse_records,
+# so Digraph is looked up when read_digraph runs rather than imported
+import digraph
+
+Vertex = collections.namedtuple("Vertex", "id lat lon")
+Edge = collections.namedtuple("Edge", "start stop name")
+
+class GraphFormatError(Exception):
+    """
+    Raised for a line of the csv file that can not be understood.
+    """
+    def __init__(self, line_num, line, reason):
+        Exception.__init__(self,
+            "line {}: {}: |{}|".format(line_num, reason, line))
+        self.line_num = line_num
+
+def parse_records(digraph_file):
+    """
+    Generates a Vertex or Edge for each line of digraph_file.
+
+    Every edge endpoint must have been declared by an earlier vertex
+    record, we don't want auto adding of vertices when adding an edge.
+    Only the set of vertex ids seen so far is kept for that check.
+
+    >>> import io
+    >>> list(parse_records(io.StringIO('V,1,2.0,3.0\\nE,1,9,"Nowhere"\\n')))
+    Traceback (most recent call last):
+    ...
+    readgraph.GraphFormatError: line 2: Edge (1, 9) has an endpoint that is not a vertex: |E,1,9,"Nowhere"|
+    >>> list(parse_records(io.StringIO('V,1,2.0\\n')))
+    Traceback (most recent call last):
+    ...
+    readgraph.GraphFormatError: line 1: wrong number of fields: |V,1,2.0|
+    >>> list(parse_records(io.StringIO('X,1\\n')))
+    Traceback (most recent call last):
+    ...
+    readgraph.GraphFormatError: line 1: weird line: |X,1|
+    >>> list(parse_records(io.StringIO('V,one,2.0,3.0\\n')))
+    Traceback (most recent call last):
+    ...
+    readgraph.GraphFormatError: line 1: invalid literal for int() with base 10: 'one': |V,one,2.0,3.0|
+    """
+    V = set()
+
+    for (line_num, line) in enumerate(digraph_file, 1):
+        # strip all trailing whitespace
+        line = line.rstrip()
+
+        fields = line.split(",", 3)
+        type = fields[0]
+
+        if type in ('V', 'E') and len(fields) != 4:
+            raise GraphFormatError(line_num, line, "wrong number of fields")
+
+        try:
+            if type == 'V':
+                # got a vertex record
+                (id, lat, lon) = fields[1:]
+                # vertex id's should be ints, lat and long are floats
+                v = Vertex(int(id), float(lat), float(lon))
+                V.add(v.id)
+                yield v
+
+            elif type == 'E':
+                # got an edge record
+                (start, stop, name) = fields[1:]
+
+                # vertices are ints, get rid of leading and trailing
+                # quote " chars around name
+                e = Edge(int(start), int(stop), name.strip('"'))
+
+                if e.start not in V or e.stop not in V:
+                    raise GraphFormatError(line_num, line,
+                        "Edge {} has an endpoint that is not a vertex".format(
+                            (e.start, e.stop)))
+                yield e
+
+            else:
+                # weird input
+                raise GraphFormatError(line_num, line, "weird line")
+
+        except ValueError as err:
+            # int() or float() could not read a field
+            raise GraphFormatError(line_num, line, str(err))
+
+def read_digraph(digraph_file):
+    """
+    Returns (G, V_coord) where G is the Digraph of the records in
+    digraph_file and V_coord maps each vertex to (lat, long).  Street
+    names are not kept; use parse_records directly to see them.
+
+    >>> import io
+    >>> f = io.StringIO('V,1,53.5,-113.5\\nV,2,53.6,-113.4\\nE,2,1,"Main St"\\n')
+    >>> (G, V_coord) = read_digraph(f)
+    >>> G.edges() == { (2, 1) }
+    True
+    >>> V_coord[1]
+    (53.5, -113.5)
+    """
+    G = digraph.Digraph()
+    V_coord = { }
+    for r in parse_records(digraph_file):
+        if isinstance(r, Vertex):
+            G.add_vertex(r.id)
+            V_coord[r.id] = (r.lat, r.lon)
+        else:
+            G.add_edge((r.start, r.stop))
+    return (G, V_coord)
+
+if __name__ == "__main__":
+    # throw away executable name before processing command line arguments
+    argv = sys.argv[1:]
+
+    # if filename is supplied, use that, otherwise use stdin
+    if argv:
+        digraph_file_name = argv.pop(0)
+        digraph_file = open(digraph_file_name, 'r')
     else:
-        # weird input
-        raise Exception("Error: weird line |{}|".format(line))
-
-if True:
-    print(V_coord)
-    print()
-    print(E_name)
+        digraph_file = sys.stdin
+
+    try:
+        for r in parse_records(digraph_file):
+            print(r)
+    except GraphFormatError as err:
+        print("Error: {}".format(err), file=sys.stderr)
+        sys.exit(1)
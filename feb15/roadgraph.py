@@ -0,0 +1,264 @@
+"""
+Loads a road network csv file, like edmonton-roads-digraph.txt, and
+keeps a binary snapshot of it next to the csv file so later runs do
+not have to parse the text again.
+
+The csv file has one record per line:
+    V,id,lat,lon            a vertex and its coordinates
+    E,start,stop,"name"     a directed edge and the street it is on
+It is read with readgraph.parse_records, so a bad line is reported as a
+readgraph.GraphFormatError with its line number.
+
+The snapshot holds
+    the vertex ids, and their latitudes and longitudes as double arrays
+    the edges in compressed sparse row (CSR) form: the edges leaving
+        vertex number i are targets[offsets[i]:offsets[i+1]], where
+        vertex numbers are positions in the id array
+    for each edge, an index into the table of distinct street names
+
+The snapshot is used as long as the csv file has the same modification
+time and size as when the snapshot was written.  If the time changed
+but the sha1 hash of the contents did not, the snapshot is still good,
+and its recorded time is updated so the hash is not needed next time.
+Otherwise the csv file is parsed again and the snapshot rewritten.
+
+>>> import os, tempfile
+>>> d = tempfile.mkdtemp()
+>>> csv_name = os.path.join(d, "roads.txt")
+>>> with open(csv_name, "w") as f:
+...     n = f.write('V,1,53.5,-113.5\\nV,2,53.6,-113.4\\nV,3,53.7,-113.3\\n'
+...                 'E,1,2,"Main St"\\nE,2,3,"Main St"\\nE,3,1,"Side Ave"\\n')
+>>> R = load_road_graph(csv_name)
+>>> (R.num_vertices(), R.num_edges())
+(3, 3)
+>>> sorted(R.edges())
+[(1, 2), (2, 3), (3, 1)]
+>>> R.coordinates()[2]
+[53.6, -113.4]
+>>> R.names
+['Main St', 'Side Ave']
+>>> os.path.exists(csv_name + ".snap")
+True
+>>> R2 = load_road_graph(csv_name)
+>>> sorted(R2.edges()) == sorted(R.edges()) and R2.names == R.names
+True
+>>> with open(csv_name, "a") as f:
+...     n = f.write('E,1,3,"Main St"\\n')
+>>> load_road_graph(csv_name).num_edges()
+4
+>>> for name in os.listdir(d): os.remove(os.path.join(d, name))
+>>> os.rmdir(d)
+"""
+
+from array import array
+import hashlib
+import os
+import struct
+import sys
+
+import readgraph
+
+# The header is a tag and the facts about the csv file the snapshot was
+# made from, followed by the array lengths and the number of names.
+# Array data is written in the machine's byte order, which is part of
+# the tag.
+_MAGIC = ("ROADSNAP1" + sys.byteorder[0]).encode()
+_HEADER = struct.Struct("<10sqq20sqqqq")
+
+class RoadGraph:
+    """
+    The parsed contents of a road network csv file, see the module
+    description for the layout.
+    """
+
+    def __init__(self, ids, lat, lon, offsets, targets, edge_names, names):
+        self.ids = ids
+        self.lat = lat
+        self.lon = lon
+        self.offsets = offsets
+        self.targets = targets
+        self.edge_names = edge_names
+        self.names = names
+
+    def num_vertices(self):
+        return len(self.ids)
+
+    def num_edges(self):
+        return len(self.targets)
+
+    def coordinates(self):
+        """
+        Returns a dictionary that maps each vertex id to [lat, lon].
+        """
+        return { v: [a, b] for (v, a, b) in zip(self.ids, self.lat, self.lon) }
+
+    def edges(self):
+        """
+        Generates the edges as (start id, stop id) pairs.
+        """
+        ids = self.ids
+        offsets = self.offsets
+        targets = self.targets
+        for i in range(len(ids)):
+            v = ids[i]
+            for j in range(offsets[i], offsets[i+1]):
+                yield (v, ids[targets[j]])
+
+    def street_names(self):
+        """
+        Generates (start id, stop id, street name) for every edge, in
+        the same order as edges: grouped by start vertex, in the order
+        the vertices appear in the csv file.
+        """
+        names = self.names
+        edge_names = self.edge_names
+        for (j, e) in enumerate(self.edges()):
+            yield (e[0], e[1], names[edge_names[j]])
+
+def load_road_graph(csv_name, snapshot_name=None):
+    """
+    Returns the RoadGraph for csv_name, from its snapshot if that is up
+    to date, otherwise by parsing csv_name and writing a new snapshot.
+    The snapshot defaults to csv_name + ".snap".
+    """
+    if snapshot_name is None:
+        snapshot_name = csv_name + ".snap"
+
+    st = os.stat(csv_name)
+    digest = None
+    try:
+        with open(snapshot_name, "rb") as f:
+            header = f.read(_HEADER.size)
+            (magic, mtime, size, old_digest, n, m, name_bytes, num_names) = _HEADER.unpack(header)
+            if magic == _MAGIC and size == st.st_size:
+                if mtime != st.st_mtime_ns:
+                    digest = _file_digest(csv_name)
+                if digest is None or digest == old_digest:
+                    R = _read_arrays(f, n, m, name_bytes, num_names)
+                    if digest is not None:
+                        # the csv was only touched; record its new mtime
+                        # so the next load need not hash it again
+                        _restamp_snapshot(snapshot_name, st, header)
+                    return R
+    except (OSError, struct.error, EOFError, ValueError):
+        # missing or damaged snapshot, fall through and rebuild it
+        pass
+
+    R = parse_road_csv(csv_name)
+    if digest is None:
+        digest = _file_digest(csv_name)
+    try:
+        _write_snapshot(R, snapshot_name, st, digest)
+    except OSError:
+        # a read only directory just means no snapshot next time
+        pass
+    return R
+
+def parse_road_csv(csv_name):
+    """
+    Parses the csv file into a RoadGraph, without touching snapshots.
+
+    >>> import os, tempfile
+    >>> (fd, csv_name) = tempfile.mkstemp()
+    >>> with os.fdopen(fd, "w") as f:
+    ...     n = f.write('V,1,53.5,-113.5\\nE,1,2,"Main St"\\n')
+    >>> parse_road_csv(csv_name)
+    Traceback (most recent call last):
+    ...
+    readgraph.GraphFormatError: line 2: Edge (1, 2) has an endpoint that is not a vertex: |E,1,2,"Main St"|
+    >>> os.remove(csv_name)
+    """
+    ids = array("q")
+    lat = array("d")
+    lon = array("d")
+    index = {}
+    sources = []
+    stops = []
+    edge_names = array("i")
+    names = []
+    name_index = {}
+
+    with open(csv_name, "r") as f:
+        for r in readgraph.parse_records(f):
+            if isinstance(r, readgraph.Vertex):
+                index[r.id] = len(ids)
+                ids.append(r.id)
+                lat.append(r.lat)
+                lon.append(r.lon)
+            else:
+                sources.append(r.start)
+                stops.append(r.stop)
+                name = r.name
+                if name not in name_index:
+                    name_index[name] = len(names)
+                    names.append(name)
+                edge_names.append(name_index[name])
+
+    # counting sort of the edges by start vertex
+    n = len(ids)
+    m = len(sources)
+    offsets = array("q", bytes(8 * (n + 1)))
+    for v in sources:
+        offsets[index[v] + 1] += 1
+    for i in range(n):
+        offsets[i+1] += offsets[i]
+    fill = array("q", offsets)
+    targets = array("q", bytes(8 * m))
+    sorted_names = array("i", bytes(4 * m))
+    for j in range(m):
+        i = index[sources[j]]
+        k = fill[i]
+        targets[k] = index[stops[j]]
+        sorted_names[k] = edge_names[j]
+        fill[i] = k + 1
+
+    return RoadGraph(ids, lat, lon, offsets, targets, sorted_names, names)
+
+def _file_digest(file_name):
+    h = hashlib.sha1()
+    with open(file_name, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.digest()
+
+def _write_snapshot(R, snapshot_name, st, digest):
+    name_bytes = "\0".join(R.names).encode("utf-8")
+    # write to a temporary name first so a reader never sees half a file
+    tmp_name = snapshot_name + ".tmp"
+    with open(tmp_name, "wb") as f:
+        f.write(_HEADER.pack(_MAGIC, st.st_mtime_ns, st.st_size, digest,
+                             R.num_vertices(), R.num_edges(), len(name_bytes),
+                             len(R.names)))
+        for a in (R.ids, R.lat, R.lon, R.offsets, R.targets, R.edge_names):
+            a.tofile(f)
+        f.write(name_bytes)
+    os.replace(tmp_name, snapshot_name)
+
+def _restamp_snapshot(snapshot_name, st, header):
+    fields = list(_HEADER.unpack(header))
+    fields[1] = st.st_mtime_ns
+    try:
+        # only the header changes, so it is rewritten in place
+        with open(snapshot_name, "r+b") as f:
+            f.write(_HEADER.pack(*fields))
+    except OSError:
+        # as with writing the snapshot, not being able to just costs
+        # a hash next time
+        pass
+
+def _read_arrays(f, n, m, name_bytes, num_names):
+    arrays = []
+    for (code, count) in (("q", n), ("d", n), ("d", n), ("q", n + 1),
+                          ("q", m), ("i", m)):
+        a = array(code)
+        a.fromfile(f, count)
+        arrays.append(a)
+    data = f.read(name_bytes)
+    if len(data) != name_bytes:
+        raise EOFError("truncated snapshot")
+    names = data.decode("utf-8").split("\0") if num_names else []
+    return RoadGraph(*arrays, names)
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
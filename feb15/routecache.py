@@ -0,0 +1,112 @@
+"""
+A bounded cache of least cost paths for one graph.
+
+Trip requests repeat a lot, so the route server keeps the answers for
+the most recently used (start, dest) pairs.  When the cache is full the
+least recently used answer is dropped.
+
+Every answer is tagged with the graph's version() when it was computed.
+Adding a vertex or edge to a Digraph changes its version, and the next
+lookup then throws away everything that was cached for the old graph.
+The cost function is assumed not to change.
+
+>>> from digraph import Digraph
+>>> G = Digraph([(1, 2), (2, 3), (1, 3)])
+>>> weights = {(1, 2): 1, (2, 3): 1, (1, 3): 5, (3, 1): 1}
+>>> cache = RouteCache(G, weights.get, maxsize=2)
+>>> cache.least_cost_path(1, 3)
+[1, 2, 3]
+>>> cache.least_cost_path(1, 3)
+[1, 2, 3]
+>>> (cache.hits, cache.misses)
+(1, 1)
+>>> cache.least_cost_path(3, 1) is None
+True
+>>> cache.least_cost_path(2, 3)
+[2, 3]
+>>> (len(cache), cache.evictions)
+(2, 1)
+>>> G.add_edge((3, 1))
+>>> cache.least_cost_path(3, 1)
+[3, 1]
+>>> (len(cache), cache.invalidations)
+(1, 1)
+"""
+
+import collections
+
+import dijkstra
+
+class RouteCache:
+    """
+    Least recently used cache of least cost paths in G.
+
+    search is the function used on a miss, called as
+    search(G, start, dest, cost); it defaults to
+    dijkstra.least_cost_path.
+
+    hits, misses and evictions count lookups that were answered from
+    the cache, lookups that had to search, and answers dropped to make
+    room.  invalidations counts how many times the whole cache was
+    emptied because the graph changed.
+    """
+
+    def __init__(self, G, cost, maxsize=10000, search=None):
+        self.G = G
+        self.cost = cost
+        self.maxsize = maxsize
+        if search is None:
+            search = dijkstra.least_cost_path
+        self.search = search
+
+        # (start, dest) -> path, oldest use first
+        self._paths = collections.OrderedDict()
+        self._version = G.version()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def __len__(self):
+        return len(self._paths)
+
+    def least_cost_path(self, start, dest):
+        """
+        Returns a least cost path from start to dest, or None if there
+        is none.  The caller gets its own copy of the path.
+        """
+        if self.G.version() != self._version:
+            if self._paths:
+                self._paths.clear()
+                self.invalidations += 1
+            self._version = self.G.version()
+
+        key = (start, dest)
+        if key in self._paths:
+            self.hits += 1
+            self._paths.move_to_end(key)
+            path = self._paths[key]
+        else:
+            self.misses += 1
+            path = self.search(self.G, start, dest, self.cost)
+            self._paths[key] = path
+            if len(self._paths) > self.maxsize:
+                self._paths.popitem(last=False)
+                self.evictions += 1
+
+        if path is None:
+            return None
+        return list(path)
+
+    def stats(self):
+        """
+        Returns the counters as a dictionary.
+        """
+        return { "hits": self.hits, "misses": self.misses,
+                 "evictions": self.evictions,
+                 "invalidations": self.invalidations, "size": len(self) }
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,76 @@
+"""
+Breadth first and depth first search as generators.
+
+Each search generates one (vertex, parent, depth) event for every
+vertex reachable from root, in the order the search reaches it.  The
+root comes first, with parent None and depth 0.  The parent of a vertex
+is the vertex it was reached from, so the (parent, vertex) pairs are
+the edges of a spanning tree.
+
+The graph is given by adj, a function returning the neighbours of a
+vertex, such as G.adj_to, or lambda v: neighbours_of(G, v) for a
+(V, E) tuple graph.  Nothing is computed until the events are asked
+for, so a caller can stop part way through a big graph.
+
+spanning_tree in digraph uses it here.  Quiz4, feb8/Digraph and
+animate have their own copies, the first two with only the search
+their graph module uses.
+
+>>> adj = { 0: [1, 2], 1: [3], 2: [3, 4], 3: [0], 4: [], 5: [0] }
+>>> list(bfs(adj.get, 0))
+[(0, None, 0), (1, 0, 1), (2, 0, 1), (3, 1, 2), (4, 2, 2)]
+>>> list(dfs(adj.get, 0))
+[(0, None, 0), (2, 0, 1), (4, 2, 2), (3, 2, 2), (1, 0, 1)]
+>>> [ v for (v, parent, depth) in bfs(adj.get, 5) ]
+[5, 0, 1, 2, 3, 4]
+"""
+
+from collections import deque
+
+def bfs(adj, root):
+    """
+    Generates the (vertex, parent, depth) events of a breadth first
+    search from root.  Vertices come out in order of depth, and each
+    vertex's parent is the first vertex found with an edge to it.
+    O(n + m) time for the reachable part of the graph.
+    """
+    visited = { root }
+    # a deque, as popping the front of a list is O(length)
+    todo = deque([ (root, 0) ])
+    yield (root, None, 0)
+
+    while todo:
+        (cur, depth) = todo.popleft()
+        for n in adj(cur):
+            if n in visited: continue
+            visited.add(n)
+            yield (n, cur, depth + 1)
+            todo.append((n, depth + 1))
+
+def dfs(adj, root):
+    """
+    Generates the (vertex, parent, depth) events of a depth first
+    search from root.
+
+    All the unvisited neighbours of a vertex are pushed on the stack
+    when it is visited, and a vertex is only visited when it comes off
+    the top, so the neighbour pushed last is followed first.  The stack
+    can hold a vertex more than once, so it grows to O(m) in the worst
+    case; the time is O(n + m).
+    """
+    visited = set()
+    todo = [ (root, None, 0) ]
+
+    while todo:
+        (cur, parent, depth) = todo.pop()
+        if cur in visited: continue
+        visited.add(cur)
+        yield (cur, parent, depth)
+
+        for n in adj(cur):
+            if n not in visited:
+                todo.append((n, cur, depth + 1))
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,93 @@
+"""
+Time Graph.adj_to with the reverse index against the old adj_to that
+scanned every vertex's adjacency set for edges into v.
+
+python3 bench_adj.py [ --seed int ] [ --num_v int ] [ --num_e int ]
+    [ --samples int ]
+
+The indexed adj_to is timed on every vertex, and spanning_tree on the
+whole graph.  The old adj_to is O(n) per call, so it is timed on a
+sample of --samples (default 200) vertices and the whole-graph times
+are estimated from that.
+"""
+
+import random
+import sys
+import time
+
+import digraph
+
+class OldGraph(digraph.Graph):
+    """
+    Graph with adj_to as it was before the reverse index.
+    """
+    def adj_to(self, v):
+        neighbors = set()
+        for n in self._adjsets[v]: neighbors.add(n)
+        for n in self._adjsets:
+            if v in self._adjsets[n]:
+                neighbors.add(n)
+        return neighbors
+
+seed = None
+num_vertices = 100000
+num_edges = 300000
+num_samples = 200
+
+argv = sys.argv[1:]
+while argv:
+    token = argv.pop(0)
+    if token == "--seed":
+        seed = int(argv.pop(0))
+    elif token == "--num_v":
+        num_vertices = int(argv.pop(0))
+    elif token == "--num_e":
+        num_edges = int(argv.pop(0))
+    elif token == "--samples":
+        num_samples = int(argv.pop(0))
+    else:
+        print("Bad argument {}".format(token))
+        sys.exit(1)
+
+if seed is not None:
+    random.seed(seed)
+
+G = digraph.random_graph(num_vertices, num_edges, seed=seed)
+old = OldGraph()
+for v in range(num_vertices):
+    old.add_vertex(v)
+for e in G.edges():
+    old.add_edge(e)
+
+print("{} vertices, {} edges".format(num_vertices, num_edges))
+
+sample = random.sample(range(num_vertices), min(num_samples, num_vertices))
+for v in sample:
+    if G.adj_to(v) != old.adj_to(v):
+        print("MISMATCH at {}".format(v))
+        sys.exit(1)
+
+t = time.perf_counter()
+for v in range(num_vertices):
+    G.adj_to(v)
+new_call = (time.perf_counter() - t) / num_vertices
+
+t = time.perf_counter()
+for v in sample:
+    old.adj_to(v)
+old_call = (time.perf_counter() - t) / len(sample)
+
+print("adj_to per call:")
+print("{:>12}: {:10.2f}us".format("indexed", new_call * 1e6))
+print("{:>12}: {:10.2f}us".format("scan", old_call * 1e6))
+print("{:>12}: {:10.1f}x".format("speedup", old_call / new_call))
+
+root = sample[0]
+t = time.perf_counter()
+T = digraph.spanning_tree(G, root)
+tree_time = time.perf_counter() - t
+print("spanning_tree from {} ({} edges):".format(root, T.num_edges()))
+print("{:>12}: {:10.3f}s".format("indexed", tree_time))
+# spanning_tree calls adj_to once per vertex it reaches
+print("{:>12}: {:10.3f}s  (estimated)".format("scan",
+    tree_time + (T.num_edges() + 1) * (old_call - new_call)))
@@ -2,8 +2,9 @@
 Graph module for directed graphs.
 """
 
-import random
 import display
+import randgraph
+import traverse
 
 class Graph:
     """
@@ -16,6 +17,10 @@ class Graph:
 
     def __init__(self):
         self._adjsets = {}
+        # the reverse of _adjsets: v -> set of vertices with an edge to v
+        self._fromsets = {}
+        # kept in step with _adjsets, so num_edges is O(1)
+        self._num_edges = 0
 
     def __repr__(self):
         return "Graph({})".format(self._adjsets)
@@ -29,6 +34,7 @@ class Graph:
         """
         if v not in self._adjsets:
             self._adjsets[v] = set()
+            self._fromsets[v] = set()
 
     def add_edge(self, e):
         """
@@ -40,8 +46,11 @@ class Graph:
         >>> G.add_edge((1, 2))
         >>> G.add_edge((2, 1))
         >>> G.add_edge((1, 3))
+        >>> G.add_edge((1, 2))
         >>> G.num_edges()
         3
+        >>> G.num_edges() == len(G.edges())
+        True
         >>> G.num_vertices()
         3
         """
@@ -50,7 +59,32 @@ class Graph:
             self.add_vertex(v)
 
         # Add the edge
-        self._adjsets[e[0]].add(e[1])
+        if e[1] not in self._adjsets[e[0]]:
+            self._adjsets[e[0]].add(e[1])
+            self._fromsets[e[1]].add(e[0])
+            self._num_edges += 1
+
+    def remove_edge(self, e):
+        """
+        Removes the edge e from the graph, leaving its vertices.  Raises
+        KeyError if there is no such edge.
+
+        >>> G = Graph()
+        >>> G.add_edge((1, 2))
+        >>> G.add_edge((2, 1))
+        >>> G.remove_edge((1, 2))
+        >>> (G.num_edges(), G.num_edges() == len(G.edges()))
+        (1, True)
+        >>> G.remove_edge((1, 2))
+        Traceback (most recent call last):
+        ...
+        KeyError: (1, 2)
+        """
+        if e[0] not in self._adjsets or e[1] not in self._adjsets[e[0]]:
+            raise KeyError(tuple(e))
+        self._adjsets[e[0]].remove(e[1])
+        self._fromsets[e[1]].remove(e[0])
+        self._num_edges -= 1
 
     def edges(self):
         """
@@ -71,10 +105,14 @@ class Graph:
         display.write_dot_desc((self._adjsets.keys(), self.edges()), filename, attr)
 
     def num_edges(self):
-        m = 0
-        for v in self._adjsets:
-            m += len(self._adjsets[v])
-        return m
+        """
+        Returns the number of edges in the graph, in O(1) time.
+
+        >>> G = random_graph(50, 300)
+        >>> G.num_edges() == sum(len(G.access_to(v)) for v in range(50)) == 300
+        True
+        """
+        return self._num_edges
 
     def num_vertices(self):
         """
@@ -97,23 +135,50 @@ class Graph:
         """
         return self._adjsets[v]
 
+    def access_from(self, v):
+        """
+        Returns neighbors you can travel from to reach v.
+
+        >>> G = Graph()
+        >>> G.add_edge((1, 3))
+        >>> G.add_edge((2, 3))
+        >>> G.access_from(3) == { 1, 2 }
+        True
+        >>> G.access_from(1) == set()
+        True
+        """
+        return self._fromsets[v]
+
     def adj_to(self, v):
-        neighbors = set()
-        for n in self._adjsets[v]: neighbors.add(n)
-        for n in self._adjsets:
-            if v in self._adjsets[n]:
-                neighbors.add(n)
-        return neighbors
-
-def random_graph(n, m):
+        """
+        Returns the set of neighbors of v along edges in either
+        direction.  O(in-degree + out-degree) time, using the reverse
+        index kept by add_edge.
+
+        >>> G = Graph()
+        >>> for e in [ (1, 2), (3, 1), (2, 3), (4, 4) ]: G.add_edge(e)
+        >>> G.adj_to(1) == { 2, 3 }
+        True
+        >>> G.adj_to(4) == { 4 }
+        True
+        >>> G.remove_edge((3, 1))
+        >>> G.adj_to(1) == { 2 }
+        True
+        """
+        return self._adjsets[v] | self._fromsets[v]
+
+def random_graph(n, m, seed=None):
     """
-    Make a random Graph with n vertices and m edges.
+    Make a random Graph with n vertices and m edges, all sets of m
+    edges being equally likely.  The same seed gives the same graph.
 
     >>> G = random_graph(10, 5)
     >>> G.num_edges()
     5
     >>> G.num_vertices()
     10
+    >>> random_graph(10, 85, seed=1).edges() == random_graph(10, 85, seed=1).edges()
+    True
     >>> G = random_graph(1, 1)
     Traceback (most recent call last):
     ...
@@ -127,32 +192,29 @@ def random_graph(n, m):
     if m > max_num_edges:
         raise ValueError("For {} vertices, you want {} edges, but can only have a maximum of {}".format(n, m, max_num_edges))
 
-    while G.num_edges() < m:
-        G.add_edge(random.sample(range(n), 2))
+    for e in randgraph.gnm_edges(n, m, seed=seed):
+        G.add_edge(e)
 
     return G
 
 def spanning_tree(G, start):  
     """ 
+    Returns the breadth first search tree of G from start, as a Graph
+    with its edges directed away from start.
+
     n vertices
     m edges
-    """
-    visited = set()
-    todo = [ (start, None) ]
+    O(n + m) calls on G.adj_to
 
+    >>> G = Graph()
+    >>> for e in [ (1, 2), (2, 3), (1, 4), (4, 3), (5, 1) ]: G.add_edge(e)
+    >>> spanning_tree(G, 1).edges() == { (1, 2), (1, 4), (1, 5), (2, 3) }
+    True
+    """
     T = Graph()
-    
-    while todo:
-        (cur, e) = todo.pop(0)
-
-        if cur in visited: continue
-
-        visited.add(cur)
-        if e: T.add_edge(e)
 
-        for n in G.adj_to(cur):
-            if n not in visited:
-                todo.append((n, (cur, n)))
+    for (v, parent, depth) in traverse.bfs(G.adj_to, start):
+        if parent is not None: T.add_edge((parent, v))
                 
     return T
 
@@ -1,14 +1,26 @@
 # an extension to the graph module that generates .dot files for graphviz
+from itertools import islice
 import time
 import sys
 import digraph
-def gen_dot_desc(G, attributes={}):
+def dot_lines(G, attributes={}):
     """
+    Generates the dot description of G a line at a time: the header,
+    one line per vertex, one line per edge, and the closing brace.
+
     >>> g = ({1, 2, 3}, {(1, 2), (1, 3)} )
-    >>> s = gen_dot_desc(g)
-    >>> s
-    
- 
+    >>> for line in dot_lines(g, {"vertex_color": {2: "green"}}):
+    ...     print(line, end="")
+    digraph g {
+      ordering=out;
+      node [shape=circle];
+      edge [penwidth=3];
+      1 [label="1", style=filled, fillcolor="white"];
+      2 [label="2", style=filled, fillcolor="green"];
+      3 [label="3", style=filled, fillcolor="white"];
+      1 -> 2 [color="black" ];
+      1 -> 3 [color="black" ];
+    }
     """
     if "vertex_color" in attributes:
         vertex_color=attributes["vertex_color"]
@@ -33,7 +45,7 @@ def gen_dot_desc(G, attributes={}):
     (V, E) = G
 
     # generate the header
-    dot_desc = ( "digraph g {\n" + 
+    yield ( "digraph g {\n" + 
         "  ordering=out;\n" +
         "  node [shape=circle];\n" +
         "  edge [penwidth=3];\n" 
@@ -41,7 +53,7 @@ def gen_dot_desc(G, attributes={}):
 
     # now generate vertex and edges information
     if len(V) == 0:
-       dot_desc += "Empty [shape=ellipse];\n"
+       yield "Empty [shape=ellipse];\n"
     else:
         for n in V:
             color = "white"
@@ -52,7 +64,7 @@ def gen_dot_desc(G, attributes={}):
             if n in vertex_label: 
                 label = vertex_label[n]
 
-            dot_desc += '  {v} [label="{l}", style=filled, fillcolor="{c}"];\n'.format(
+            yield '  {v} [label="{l}", style=filled, fillcolor="{c}"];\n'.format(
                 v=str(n), l=label, c=color)
 
         for e in E:
@@ -64,22 +76,37 @@ def gen_dot_desc(G, attributes={}):
             if e in edge_label:
                 label = ', label="{}"'.format(edge_label[e])
 
-            dot_desc += '  {vx} -> {vy} [color="{c}" {l}];\n'.format(
+            yield '  {vx} -> {vy} [color="{c}" {l}];\n'.format(
                     vx=str(x), vy=str(y), c=color, l=label)
 
 
     # close off the description
-    dot_desc += "}\n"
+    yield "}\n"
 
-    return dot_desc
+def gen_dot_desc(G, attributes={}):
+    """
+    >>> g = ({1, 2, 3}, {(1, 2), (1, 3)} )
+    >>> s = gen_dot_desc(g)
+    >>> s == "".join(dot_lines(g))
+    True
+    """
+    return "".join(dot_lines(G, attributes))
 
 def write_dot_desc(G, file_name, attributes={}):
     # instead of f = open(file_name, 'w') inside a try block, use
     # the safe open that closes file on an exception, from
     # http://docs.python.org/3.2/tutorial/inputoutput.html
-
+    #
+    # The lines are written out a few thousand at a time as they are
+    # generated, rather than joined into one big string first.
+    # Joining each batch makes for far fewer calls on the file than
+    # writing the lines one by one.
     with open(file_name, 'w') as f:
-        f.write( gen_dot_desc(G, attributes) )
+        lines = dot_lines(G, attributes)
+        batch = list(islice(lines, 4096))
+        while batch:
+            f.write( "".join(batch) )
+            batch = list(islice(lines, 4096))
 
 def pause(time=1,prompt="next?"):
     # pause for time sec, or if time=0 wait for a new line from the terminal
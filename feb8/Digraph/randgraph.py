@@ -0,0 +1,56 @@
+"""
+Random directed graphs for random_graph in digraph.py.
+
+This is this directory's cut down copy of feb15/randgraph.py: only the
+directed G(n, m) generator, which is all digraph.py uses.
+
+The vertices are 0 .. n-1.  The possible edges are numbered 0 .. N-1,
+where N = n(n-1), and a random graph is a random set of those numbers
+decoded back into edges.  Generation takes O(n + m) time for m edges.
+
+>>> e = gnm_edges(10, 30, seed=1)
+>>> len(e) == len(set(e)) == 30
+True
+>>> all(0 <= u < 10 and 0 <= v < 10 and u != v for (u, v) in e)
+True
+>>> sorted(gnm_edges(3, 6))
+[(0, 1), (0, 2), (1, 0), (1, 2), (2, 0), (2, 1)]
+"""
+
+import random
+
+def edge_number(i, n):
+    """
+    Returns edge number i of the possible edges on n vertices.  Edge i
+    starts at u = i // (n-1); the remainder picks the other end among
+    the other n-1 vertices.
+
+    >>> [ edge_number(i, 3) for i in range(6) ]
+    [(0, 1), (0, 2), (1, 0), (1, 2), (2, 0), (2, 1)]
+    """
+    (u, r) = divmod(i, n - 1)
+    if r >= u:
+        r += 1
+    return (u, r)
+
+def gnm_edges(n, m, seed=None):
+    """
+    Returns a list of m distinct random edges on the vertices 0 .. n-1.
+    The caller checks that m is at most n(n-1).
+    """
+    N = n * (n - 1)
+    rng = random.Random(seed)
+
+    if m <= N // 2:
+        # random.sample of a range only remembers what it picked
+        numbers = rng.sample(range(N), m)
+    else:
+        # dense graph: pick the N - m edges to leave out
+        left_out = set(rng.sample(range(N), N - m))
+        numbers = [ i for i in range(N) if i not in left_out ]
+
+    return [ edge_number(i, n) for i in numbers ]
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()
@@ -0,0 +1,42 @@
+"""
+Breadth first search as a generator, for spanning_tree in digraph.py.
+
+This is this directory's cut down copy of feb15/traverse.py, with only
+the breadth first search that digraph.py uses.
+
+The search generates one (vertex, parent, depth) event for every vertex
+reachable from root, in the order the search reaches it.  The root
+comes first, with parent None and depth 0.  The (parent, vertex) pairs
+are the edges of a spanning tree.  adj is a function returning the
+neighbours of a vertex, such as G.adj_to.
+
+>>> adj = { 0: [1, 2], 1: [3], 2: [3, 4], 3: [0], 4: [], 5: [0] }
+>>> list(bfs(adj.get, 0))
+[(0, None, 0), (1, 0, 1), (2, 0, 1), (3, 1, 2), (4, 2, 2)]
+"""
+
+from collections import deque
+
+def bfs(adj, root):
+    """
+    Generates the (vertex, parent, depth) events of a breadth first
+    search from root.  Vertices come out in order of depth, and each
+    vertex's parent is the first vertex found with an edge to it.
+    O(n + m) time for the reachable part of the graph.
+    """
+    visited = { root }
+    # a deque, as popping the front of a list is O(length)
+    todo = deque([ (root, 0) ])
+    yield (root, None, 0)
+
+    while todo:
+        (cur, depth) = todo.popleft()
+        for n in adj(cur):
+            if n in visited: continue
+            visited.add(n)
+            yield (n, cur, depth + 1)
+            todo.append((n, depth + 1))
+
+if __name__ == "__main__":
+    import doctest
+    doctest.testmod()